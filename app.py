@@ -1,11 +1,19 @@
 import streamlit as st
-import pandas as pd
 import streamlit.components.v1 as components
+import hmac
 import io
-import plotly.io as pio
-from utils.scoring import load_questions, compute_final_levels
-from utils.charts import radar_chart
-from functools import lru_cache
+import os
+import uuid
+from utils import export
+from utils.admission import EXPENSIVE, Busy
+from utils.background import Refreshing
+from utils.scoring import DIMENSIONS, level_deltas, record_score, undo_score
+from utils.history import HistoryStore
+from utils.similarity import ProfileIndex
+from utils.routing import ESCALATE_LABEL, Router
+from utils.search import index_for
+from utils.questionnaire import DEFAULT_VARIANT, get_questionnaire, preload_all, start_watcher, variant_keys
+from utils.charts import mini_radar, radar_chart, radar_trend_chart
 from reportlab.lib.pagesizes import A4
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -133,94 +141,89 @@ def scroll_to_top():
     </script>
     """, height=0)
 
-# Load your CSV (required columns: id,dimension,question, option_1,score_1,next_1 ... option_4,score_4,next_4, optional: terminal)
-df = load_questions("data/questions.csv")  # reads as strings, fills blanks
-
-# Load the RL descriptions
-# ---- RL descriptions (for the results expanders) ----
-@st.cache_data
-def load_rl_descriptions(path: str = "data/rl_descriptions.csv"):
-    """Load per-dimension, per-level texts from CSV.
-    CSV columns: dimension,level,title,body
-    """
-    try:
-        df = pd.read_csv(path, dtype={"dimension": str, "level": int, "title": str, "body": str})
-    except Exception:
-        # If file not found or broken, return empty dict (UI will show a fallback message)
-        return {}
-
-    out = {}
-    for _, r in df.iterrows():
-        dim = (r.get("dimension", "") or "").strip().upper()
-        if not dim:
-            continue
-        try:
-            lvl = int(r.get("level", 0))
-        except Exception:
-            continue
-        out.setdefault(dim, {})[lvl] = {
-            "title": (r.get("title", "") or "").strip(),
-            "body": (r.get("body", "") or "").strip(),
-        }
-    return out
+# Questionnaire variants (data/questions.csv + data/variants/<key>/) are compiled
+# once per server process and shared read-only by all sessions. A background
+# watcher recompiles a variant when its CSVs are edited.
+@st.cache_resource
+def _preload_questionnaires() -> bool:
+    preload_all()
+    start_watcher()
+    return True
+
+_preload_questionnaires()
+
+# each session sticks to one variant, picked via ?q=<key> or on the welcome page
+if "variant" not in st.session_state:
+    st.session_state.variant = st.query_params.get("q", DEFAULT_VARIANT)
+# a started assessment stays on the snapshot it began with; reset() moves to the latest
+if "qn" not in st.session_state or not st.session_state.get("started"):
+    st.session_state.qn = get_questionnaire(st.session_state.variant)
+QN = st.session_state.qn
+
+# Start Kaleido/Chromium once per server process so the first PDF doesn't pay for it
+@st.cache_resource
+def _warm_renderer() -> bool:
+    return export.warm_up()
+
+_warm_renderer()
+
+# Re-assessment history (SQLite, shared by all sessions)
+@st.cache_resource
+def get_history_store() -> HistoryStore:
+    return HistoryStore()
+
+# Adaptive routing (?routing=adaptive or SRA_ROUTING=adaptive): enter each dimension at
+# the question its priors point to instead of always at the top; see utils/routing.py
+if "adaptive" not in st.session_state:
+    st.session_state.adaptive = st.query_params.get("routing", os.environ.get("SRA_ROUTING", "")) == "adaptive"
+
+# Programme-manager view (?manager=<SRA_MANAGER_KEY>): peers are listed by name;
+# founders only see anonymised peer profiles
+if "manager" not in st.session_state:
+    manager_key = os.environ.get("SRA_MANAGER_KEY", "")
+    # compare bytes: compare_digest rejects str with non-ASCII characters
+    st.session_state.manager = bool(manager_key) and hmac.compare_digest(
+        st.query_params.get("manager", "").encode(), manager_key.encode())
+
+# Routers and the peer index learn from stored assessments. Only the first request of a
+# process builds them; after that new rows are folded in by a background thread, so no
+# founder's page waits for a reload of the whole history.
+def _levels(rows: list[tuple]) -> list[dict]:
+    return [{d: v for d, v in zip(DIMENSIONS, r[5:]) if v is not None} for r in rows]
+
+@st.cache_resource
+def _router_state(key: str, version: str, _qn) -> Refreshing:
+    def refresh(state):
+        r, last_id = state
+        # only this variant's assessments: band statistics don't carry across questionnaires
+        rows = get_history_store().profile_rows(after_id=last_id, variant=key)
+        return (r.updated(_levels(rows)), rows[-1][0]) if rows else state
+    return Refreshing(lambda: refresh((Router(_qn), 0)), refresh, 3600, f"router-{key}")
+
+def router() -> Router | None:
+    return _router_state(QN.key, QN.version, QN).get()[0] if st.session_state.adaptive else None
+
+@st.cache_resource
+def _peer_index() -> Refreshing:
+    return Refreshing(
+        lambda: ProfileIndex.from_rows(get_history_store().profile_rows()),
+        lambda idx: idx.extend(get_history_store().profile_rows(after_id=idx.max_id)),
+        600, "peer-index",
+    )
 
-RL_TEXT = load_rl_descriptions()  # <-- creates the dict you use in the results expanders
+def get_profile_index() -> ProfileIndex:
+    return _peer_index().get()
 
-def build_pdf_report(fig, final_levels, rl_text) -> io.BytesIO:
+def build_pdf_report(fig, final_levels, rl_text) -> tuple[io.BytesIO, bool]:
     """
     Build a PDF with:
     - title
     - radar chart image
     - per-dimension level + description
-    Returns a BytesIO ready to pass to st.download_button.
+    Returns (BytesIO ready to pass to st.download_button, whether the chart made it in).
     """
     buf = io.BytesIO()
 
-    # --- basic ReportLab doc ---
-    doc = SimpleDocTemplate(buf, pagesize=A4,
-                            leftMargin=2*cm, rightMargin=2*cm,
-                            topMargin=2*cm, bottomMargin=2*cm)
-    styles = getSampleStyleSheet()
-    # Optional: tweak a couple styles
-    title_style = styles["Title"]
-    title_style.fontName = "Helvetica-Bold"
-    title_style.fontSize = 18
-
-    heading_style = styles["Heading2"]
-    heading_style.spaceBefore = 12
-    heading_style.spaceAfter = 4
-
-    body_style = styles["BodyText"]
-    body_style.spaceAfter = 6
-
-    elems = []
-
-    # --- Title ---
-    elems.append(Paragraph("Startup Readiness Assessment", title_style))
-    elems.append(Spacer(1, 0.5*cm))
-
-  # Radar chart as image
-    try:
-        img_bytes = pio.to_image(
-            fig,
-            format="png",
-            width=600,
-            height=600,
-            scale=1,
-        )
-        img_buf = io.BytesIO(img_bytes)
-
-        img = Image(img_buf)
-        max_width = 14 * cm
-        max_height = 14 * cm
-        img._restrictSize(max_width, max_height)
-
-        elems.append(img)
-        elems.append(Spacer(1, 0.7 * cm))
-    except Exception:
-        elems.append(Paragraph("Radar chart could not be rendered in this PDF.", body_style))
-        elems.append(Spacer(1, 0.7 * cm))
-
     # --- basic ReportLab doc ---
     doc = SimpleDocTemplate(
         buf,
@@ -243,6 +246,7 @@ def build_pdf_report(fig, final_levels, rl_text) -> io.BytesIO:
     body_style.spaceAfter = 6
 
     elems = []
+    with_chart = True
 
     # --- Title ---
     elems.append(Paragraph("Startup Readiness Assessment", title_style))
@@ -250,13 +254,7 @@ def build_pdf_report(fig, final_levels, rl_text) -> io.BytesIO:
 
     # --- Radar chart as image ---
     try:
-        img_bytes = pio.to_image(
-            fig,
-            format="png",
-            width=600,
-            height=600,
-            scale=1,
-        )
+        img_bytes = export.to_image(fig, fmt="png", width=600, height=600, scale=1)
         img_buf = io.BytesIO(img_bytes)
 
         img = Image(img_buf)
@@ -268,6 +266,7 @@ def build_pdf_report(fig, final_levels, rl_text) -> io.BytesIO:
         elems.append(Spacer(1, 0.7 * cm))
     except Exception:
         # If image export fails, still build the PDF with text only
+        with_chart = False
         elems.append(Paragraph("Radar chart could not be rendered in this PDF.", body_style))
         elems.append(Spacer(1, 0.7 * cm))
 
@@ -297,46 +296,11 @@ def build_pdf_report(fig, final_levels, rl_text) -> io.BytesIO:
 
     doc.build(elems)
     buf.seek(0)
-    return buf
-
-# Build adjacency list {qid: [next_qids]}
-def _adjacency_from_df(df: pd.DataFrame) -> dict[str, list[str]]:
-    adj: dict[str, list[str]] = {}
-    for _, r in df.iterrows():
-        qid = str(r["id"])
-        nxts = []
-        for i in range(1, 5):
-            nx = str(r.get(f"next_{i}", "")).strip()
-            if nx:
-                nxts.append(nx)
-        adj[qid] = nxts
-    return adj
-
-ADJ = _adjacency_from_df(df)
-
-@lru_cache(maxsize=None)
-def _bounds_from(qid: str) -> tuple[int, int]:
-    """
-    Returns (min_steps, max_steps) from qid to FINISH, counting the CURRENT question.
-    If a question has no nexts (or terminal), min=max=1.
-    """
-    # guard
-    if qid not in ADJ:
-        return (1, 1)
-    nxts = ADJ[qid]
-    if not nxts:
-        return (1, 1)
-    mins, maxs = [], []
-    for nx in nxts:
-        m, M = _bounds_from(nx)
-        mins.append(m)
-        maxs.append(M)
-    # +1 to include the current question
-    return (1 + min(mins), 1 + max(maxs))
+    return buf, with_chart
 
 def progress_caption(answered: int, qid: str) -> tuple[int, int, int]:
     """Returns (current_index, total_min, total_max) for display."""
-    m, M = _bounds_from(qid)           # includes current question
+    m, M = QN.bounds.get(qid, (1, 1))  # includes current question
     total_min = answered + m
     total_max = answered + M
     current_index = answered + 1       # we are on this question
@@ -464,22 +428,25 @@ main .block-container {{ padding-top:0 !important; margin-top:0 !important; }}
 
 # ------------- Helpers -------------
 def get_row(qid: str):
-    row = df[df["id"] == qid]
-    return None if row.empty else row.iloc[0]
+    return QN.rows.get(qid)
 
 def start_question_id() -> str:
-    # Start from the first row in your CSV (or hardcode an id you prefer)
-    return df["id"].iloc[0]
+    r = router()
+    return r.route(QN.start, {}) if r else QN.start
 
 def go_to(qid: str | None):
     st.session_state.current_qid = qid if qid and qid.strip() else None
 
 def reset():
+    global QN
+    QN = st.session_state.qn = get_questionnaire(st.session_state.variant)
     st.session_state.current_qid = start_question_id()
     st.session_state.history_by_dim = {}    # {"BRL":[...], "CRL":[...], ...}
+    st.session_state.final_levels = {}      # running last valid score per dim (see record_score)
     st.session_state.finished = False
     st.session_state.stack = []             # history of answered questions
     st.session_state.saved_choices = {}     # qid -> index to preselect when going back
+    st.session_state.saved_key = None       # (startup, version, levels) last saved to history
 
 def push_step(qid, dim, score_or_none, choice_idx):
     """Record one answered step so we can go back later."""
@@ -505,16 +472,21 @@ def pop_step_and_undo():
         return None
     step = st.session_state.stack.pop()
     if step["score"] is not None:
-        dim = step["dim"]
-        if dim in st.session_state.history_by_dim and st.session_state.history_by_dim[dim]:
-            # remove last score if it matches what we added on that step
-            if st.session_state.history_by_dim[dim][-1] == step["score"]:
-                st.session_state.history_by_dim[dim].pop()
+        # remove last score if it matches what we added on that step
+        undo_score(st.session_state.history_by_dim, st.session_state.final_levels,
+                   step["dim"], step["score"])
     st.session_state.finished = False
     return step["qid"]
 
 # ---------------- Landing / Welcome ----------------
 def show_welcome():
+    keys = variant_keys()
+    if len(keys) > 1:
+        choice = st.selectbox("Questionnaire", keys, index=keys.index(QN.key))
+        if choice != QN.key:
+            st.session_state.variant = choice
+            st.rerun()
+
     st.markdown("""
     <div style="background:rgba(255,249,229,.06); padding:18px 18px; border-radius:14px; border:1px solid rgba(220,208,168,.35)">
       <h3 style="margin:0 0 8px 0; color:#FFF9E5;">What is this?</h3>
@@ -549,16 +521,22 @@ if st.session_state.get("do_scroll_top"):
     scroll_to_top()
 
 # ------------- Init state -------------
+if "sid" not in st.session_state:
+    st.session_state.sid = uuid.uuid4().hex   # identifies this session in the work queues
 if "current_qid" not in st.session_state:
     reset()
 if "finished" not in st.session_state:
     st.session_state.finished = False
 if "history_by_dim" not in st.session_state:
     st.session_state.history_by_dim = {}
+if "final_levels" not in st.session_state:
+    st.session_state.final_levels = {}
 if "stack" not in st.session_state:
     st.session_state.stack = []
 if "saved_choices" not in st.session_state:
     st.session_state.saved_choices = {}
+if "saved_key" not in st.session_state:
+    st.session_state.saved_key = None
 
 # ---- Gate: show landing page first ----
 if not st.session_state.started:
@@ -589,6 +567,12 @@ if not st.session_state.finished and st.session_state.current_qid is not None:
                 nxt = row.get(f"next_{i}", "")
                 opts.append((opt, score, nxt))
 
+        # adaptive entry below the top of a dimension: let them climb back up
+        r = router()
+        escalate_to = r.escalation(row["id"], {s["qid"] for s in st.session_state.stack}) if r else None
+        if escalate_to:
+            opts.append((ESCALATE_LABEL, "", escalate_to))
+
         if not opts:
             st.warning("No options defined for this question. Ending.")
             st.session_state.finished = True
@@ -597,8 +581,10 @@ if not st.session_state.finished and st.session_state.current_qid is not None:
 
             # default selection (persist per question)
             qkey = f"choice_{row['id']}"
-            if qkey not in st.session_state:
-                default_index = st.session_state.saved_choices.get(row["id"], 0)
+            # (re)initialize when unset or when the kept label is no longer offered
+            # (e.g. the escalation tile disappears once the question above was visited)
+            if st.session_state.get(qkey) not in labels:
+                default_index = min(st.session_state.saved_choices.get(row["id"], 0), len(labels) - 1)
                 # initialize the persistent selection
                 st.session_state[qkey] = labels[default_index]
             # progress just before the question
@@ -609,6 +595,16 @@ if not st.session_state.finished and st.session_state.current_qid is not None:
 
             render_progress(answered, total_min, total_max)
 
+            # live profile in the sidebar; the fixed key keeps the same chart mounted so the
+            # browser only diffs the polygon instead of redrawing a new chart each step
+            if st.session_state.final_levels:
+                st.sidebar.plotly_chart(
+                    mini_radar(st.session_state.final_levels),
+                    use_container_width=True,
+                    config={"displayModeBar": False},
+                    key="live_radar",
+                )
+
           # --- BACK button (outside the form) ---
             st.markdown('<div class="back-btn">', unsafe_allow_html=True)
             back_clicked = st.button("⬅ Back", key=f"back_{row['id']}", use_container_width=True)
@@ -640,22 +636,28 @@ if not st.session_state.finished and st.session_state.current_qid is not None:
                 # record score only if valid (>0 integer)
                 try:
                     if sel_score and sel_score.strip().isdigit() and int(sel_score) > 0:
-                        st.session_state.history_by_dim.setdefault(dim, []).append(int(sel_score))
+                        record_score(st.session_state.history_by_dim, st.session_state.final_levels,
+                                     dim, int(sel_score))
                 except Exception:
                     pass
 
-                # remember selection for this qid (so it's preselected if user comes back)
-                st.session_state.saved_choices[row["id"]] = choice_idx
+                escalating = escalate_to is not None and choice_idx == len(opts) - 1
+
+                # remember selection for this qid (so it's preselected if user comes back);
+                # not the escalation tile, which is gone once the question above was visited
+                if not escalating:
+                    st.session_state.saved_choices[row["id"]] = choice_idx
 
                 # push step for Back
                 push_step(qid=row["id"], dim=dim, score_or_none=sel_score, choice_idx=choice_idx)
 
                 # advance or finish
-                terminal = row.get("terminal", "").strip().upper() == "TRUE"
+                terminal = row.get("terminal", "").strip().upper() == "TRUE" and not escalating
                 if terminal or not sel_next or not sel_next.strip():
                     st.session_state.finished = True
                 else:
-                    go_to(sel_next)
+                    # an escalation target is the top of its chain: don't re-route it
+                    go_to(r.route(sel_next, st.session_state.final_levels) if r and not escalating else sel_next)
 
                 # ⬇️ set scroll-to-top for the next render, then rerun
                 st.session_state["do_scroll_top"] = True
@@ -673,29 +675,41 @@ if st.session_state.finished or st.session_state.current_qid is None:
                 go_to(prev_qid)
             st.stop()
 
-    final_levels = compute_final_levels(st.session_state.history_by_dim)
+    final_levels = st.session_state.final_levels   # maintained on confirm / back
 
     if not final_levels:
         st.info("No levels recorded. Try restarting.")
     else:
+        order = ["CRL", "SRL", "BRL", "TMRL", "FRL", "IPRL", "TRL"]
+
         # Radar
         fig = radar_chart(final_levels)
         st.plotly_chart(fig, use_container_width=True)
 
-        # PDF download
-        pdf_buffer = build_pdf_report(fig, final_levels, RL_TEXT)
-        st.download_button(
-            "📄 Download PDF report",
-            data=pdf_buffer,
-            file_name="startup_readiness_report.pdf",
-            mime="application/pdf",
+        # Peers: nearest stored profiles (same cohort if one was given)
+        peers = get_profile_index().query(
+            final_levels,
+            k=5,
+            cohort=st.session_state.get("cohort") or None,
+            exclude_startup=st.session_state.get("startup_name") or None,
         )
+        if peers:
+            with st.expander("Startups with similar profiles", expanded=False):
+                for n, p in enumerate(peers, 1):
+                    lv = " · ".join(f"{d} {p['levels'][d]}" for d in order if d in p["levels"])
+                    if st.session_state.manager:
+                        st.markdown(f"**{p['startup']}** ({p['taken_at'][:10]}) — {lv}")
+                    else:
+                        st.markdown(f"**Peer {n}** — {lv}")
+
+        # PDF download shows up here but is built at the end of the page, so waiting in
+        # the export queue doesn't hold back the level texts, search and history below
+        pdf_area = st.container()
 
         # One expander per dimension in a stable order
-        order = ["CRL", "SRL", "BRL", "TMRL", "FRL", "IPRL", "TRL"]
         for dim in [d for d in order if d in final_levels] + [d for d in final_levels if d not in order]:
             lvl = int(final_levels[dim])
-            info = RL_TEXT.get(dim, {}).get(lvl)
+            info = QN.rl_text.get(dim, {}).get(lvl)
             label = f"{dim} {lvl}"
             with st.expander(label, expanded=False):
                 if info:
@@ -703,15 +717,117 @@ if st.session_state.finished or st.session_state.current_qid is None:
                         st.markdown(f"### {info['title']}")
                     if info["body"]:
                         st.markdown(info["body"])
+                    related = index_for(QN).related(dim, lvl, k=3)
+                    if related:
+                        st.caption("Related statements: " + " · ".join(
+                            f"{h['dim']}{' ' + str(h['level']) if h['level'] else ''} — {h['text']}"
+                            for h in related
+                        ))
                 else:
                     st.markdown("_No description available for this level yet._")
                     st.caption("Add it to data/rl_descriptions.csv to show it here.")
 
+        # ---- Search across answer statements and level descriptions ----
+        with st.expander("🔎 Search levels and statements", expanded=False):
+            query = st.text_input("Search", placeholder="e.g. term sheet, CRM, pilots",
+                                  label_visibility="collapsed")
+            if query.strip():
+                hits = index_for(QN).search(query, k=8)
+                if not hits:
+                    st.caption("No matches.")
+                for h in hits:
+                    where = f"{h['dim']} {h['level']}" if h["level"] else f"{h['dim']} (branch)"
+                    kind = "Level description" if h["kind"] == "level" else "Answer statement"
+                    st.markdown(f"**{where}** · {kind} — {h['text']}")
+
+        # ---- History: save this result and compare with earlier assessments ----
+        # A startup name is claimed with an access code on its first save; saving again and
+        # seeing the history needs that code, so typing someone else's name shows nothing.
+        store = get_history_store()
+        with st.form("save_history", clear_on_submit=False):
+            st.markdown("### Track your progress")
+            startup_name = st.text_input("Startup name", value=st.session_state.get("startup_name", ""))
+            access_code = st.text_input("Access code (leave empty on your first save)", type="password")
+            cohort = st.text_input("Programme / cohort (optional)", value=st.session_state.get("cohort", ""))
+            save_clicked = st.form_submit_button("Save this assessment", use_container_width=True)
+        if save_clicked and startup_name.strip():
+            name = startup_name.strip()
+            new_code = None if access_code.strip() else store.issue_code(name)
+            saved_key = (name, QN.version, tuple(sorted(final_levels.items())))
+            if new_code is None and not (
+                    name == st.session_state.get("startup_name") or store.check_code(name, access_code)):
+                st.error("That startup name and access code don't match. Leave the code empty the "
+                         "first time you save; if you lost it, your programme team can issue a new one.")
+            elif st.session_state.saved_key == saved_key:
+                st.info("This assessment is already saved.")
+            else:
+                store.save(name, final_levels, cohort=cohort, variant=QN.key)
+                st.session_state.saved_key = saved_key
+                st.session_state.startup_name = name
+                st.session_state.cohort = cohort.strip()
+                if new_code:
+                    st.session_state.access_code = new_code
+        if st.session_state.get("access_code"):
+            st.success(f"Your access code for {st.session_state.startup_name}: "
+                       f"`{st.session_state.access_code}` — keep it, you'll need it to save your "
+                       "next assessment and see this history.")
+
+        if st.session_state.get("startup_name"):
+            past = store.history(st.session_state.startup_name)[-6:]
+            if len(past) > 1:
+                st.plotly_chart(
+                    radar_trend_chart([(r["taken_at"][:10], r["levels"]) for r in past]),
+                    use_container_width=True,
+                )
+                deltas = level_deltas(past[-2]["levels"], past[-1]["levels"])
+                st.caption("Since " + past[-2]["taken_at"][:10] + ": " + " · ".join(
+                    f"{d} {deltas[d]:+d}" for d in order if d in deltas
+                ))
+
     if st.button("Restart the assessment"):
         reset()
         st.session_state["do_scroll_top"] = True
         st.rerun()
 
+    if final_levels:
+        with pdf_area:
+            # PDF download: built once per profile, through the expensive-work queue so a
+            # room full of people finishing together doesn't pile up Kaleido exports
+            pdf_key = (QN.version, tuple(sorted(final_levels.items())))
+            # a text-only PDF (chart export timed out or failed) is not kept as the report:
+            # it is offered with a Retry button and rebuilt when that is clicked
+            stale = st.session_state.get("pdf_key") != pdf_key
+            offer_retry = False
+            if stale or (not st.session_state.get("pdf_complete") and st.session_state.get("retry_pdf")):
+                queue_note = st.empty()
+
+                def show_position(pos: int, eta: float):
+                    queue_note.info(f"⏳ Preparing your PDF report — you're #{pos} in line (about {eta:.0f}s).")
+
+                try:
+                    with EXPENSIVE.slot(st.session_state.sid, on_wait=show_position):
+                        queue_note.empty()
+                        pdf, complete = build_pdf_report(fig, final_levels, QN.rl_text)
+                        st.session_state.pdf_bytes = pdf.getvalue()
+                        st.session_state.pdf_key = pdf_key
+                        st.session_state.pdf_complete = complete
+                except Busy:
+                    queue_note.warning("Lots of reports are being generated right now. Your results are below — try the PDF again in a moment.")
+                    offer_retry = True
+
+            if st.session_state.get("pdf_key") == pdf_key:
+                if not st.session_state.pdf_complete:
+                    st.warning("The chart couldn't be rendered just now, so this PDF has text only.")
+                    offer_retry = True
+                st.download_button(
+                    "📄 Download PDF report",
+                    data=st.session_state.pdf_bytes,
+                    file_name="startup_readiness_report.pdf",
+                    mime="application/pdf",
+                )
+            if offer_retry:
+                st.button("Retry PDF", key="retry_pdf")
+
 st.markdown("""
 <style>
 /* ===== Confirm (form submit) — target only the form's submit button ===== */
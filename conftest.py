@@ -0,0 +1,6 @@
+# Lets `pytest` from the repo root import the app's `utils` package.
+import os
+import tempfile
+
+# keep app tests away from data/history.sqlite3 (read when utils.history is imported)
+os.environ.setdefault("SRA_HISTORY_DB", os.path.join(tempfile.mkdtemp(prefix="sra-tests-"), "history.sqlite3"))
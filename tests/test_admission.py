@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+
+from utils.admission import Busy, Gate
+
+
+class Abandon(Exception):
+    pass
+
+
+def _wait_for(cond, timeout=2.0):
+    end = time.monotonic() + timeout
+    while not cond() and time.monotonic() < end:
+        time.sleep(0.005)
+    assert cond()
+
+
+def _hold(gate, sid, release, admitted=None):
+    """Thread that takes a slot for `sid` and keeps it until `release` is set."""
+    def run():
+        with gate.slot(sid, poll=0.01):
+            if admitted is not None:
+                admitted.append(sid)
+            release.wait(5)
+    t = threading.Thread(target=run, daemon=True)
+    t.start()
+    return t
+
+
+def test_waiting_sessions_are_admitted_in_arrival_order():
+    gate = Gate("t", max_active=1, max_queue=10)
+    release, order = threading.Event(), []
+    threads = [_hold(gate, "first", release, order)]
+    _wait_for(lambda: order == ["first"])
+    for sid in ("b", "c", "d"):
+        threads.append(_hold(gate, sid, release, order))
+        _wait_for(lambda: sid in gate._waiting)
+
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert order == ["first", "b", "c", "d"]
+    assert gate.stats()["active"] == 0 and gate.stats()["waiting"] == 0
+
+
+def test_full_queue_raises_busy():
+    gate = Gate("t", max_active=1, max_queue=1)
+    release = threading.Event()
+    _hold(gate, "a", release)
+    _wait_for(lambda: gate.stats()["active"] == 1)
+    _hold(gate, "b", release)
+    _wait_for(lambda: gate.stats()["waiting"] == 1)
+
+    with pytest.raises(Busy):
+        with gate.slot("c"):
+            pass
+    release.set()
+
+
+@pytest.mark.parametrize("grace_s, expected", [(30.0, ["b", "c"]), (0.0, ["c", "b"])])
+def test_interrupted_wait_keeps_its_place_within_grace(grace_s, expected):
+    gate = Gate("t", max_active=1, max_queue=10, grace_s=grace_s)
+    release, order = threading.Event(), []
+    holder = _hold(gate, "a", release)
+    _wait_for(lambda: gate.stats()["active"] == 1)
+
+    def abandon(pos, eta):
+        raise Abandon()
+
+    with pytest.raises(Abandon):                # b queues, then its run is interrupted
+        with gate.slot("b", on_wait=abandon, poll=0.01):
+            pass
+    assert gate.stats()["waiting"] == 0
+    time.sleep(0.01)
+
+    threads = [_hold(gate, "c", release, order)]
+    _wait_for(lambda: "c" in gate._waiting)
+    threads.append(_hold(gate, "b", release, order))   # b comes back
+    _wait_for(lambda: "b" in gate._waiting)
+    release.set()
+    for t in [holder, *threads]:
+        t.join(5)
+
+    assert order == expected
+
+
+def test_slot_is_released_when_the_body_raises():
+    gate = Gate("t", max_active=1, max_queue=10)
+
+    with pytest.raises(RuntimeError):
+        with gate.slot("a"):
+            raise RuntimeError("export failed")
+
+    assert gate.stats()["active"] == 0
+    with gate.slot("b", on_wait=lambda *_: pytest.fail("should not queue")):
+        assert gate.stats()["active"] == 1
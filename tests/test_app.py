@@ -0,0 +1,42 @@
+import os
+
+import pytest
+
+from utils.routing import ESCALATE_LABEL
+
+AppTest = pytest.importorskip("streamlit.testing.v1").AppTest
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+
+@pytest.fixture
+def adaptive_app(monkeypatch):
+    monkeypatch.chdir(ROOT)
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60)
+    at.query_params["routing"] = "adaptive"
+    at.run()
+    at.button(key="start_assessment").click().run()
+    return at
+
+
+def _confirm(at, label):
+    at.radio[0].set_value(label)
+    next(b for b in at.button if "Confirm" in str(b.label)).click().run()
+    assert not at.exception
+
+
+def test_escalation_climbs_one_band_and_back_down_without_looping(adaptive_app):
+    at = adaptive_app
+    entry = at.radio[0].key
+    assert ESCALATE_LABEL in at.radio[0].options     # entered mid-chain
+
+    _confirm(at, ESCALATE_LABEL)
+    above = at.radio[0].key
+    assert above != entry                            # not re-routed back to the entry question
+
+    # "none of these" at the question above leads back to the entry question, which no
+    # longer offers the escalation tile that was remembered as its choice
+    _confirm(at, next(o for o in at.radio[0].options if "haven" in o))
+    assert at.radio[0].key == entry
+    assert ESCALATE_LABEL not in at.radio[0].options
+    assert at.radio[0].value in at.radio[0].options
@@ -0,0 +1,37 @@
+import threading
+import time
+
+from utils.background import Refreshing
+
+
+def _wait_for(cond, timeout=2.0):
+    end = time.monotonic() + timeout
+    while not cond() and time.monotonic() < end:
+        time.sleep(0.01)
+    return cond()
+
+
+def test_refresh_runs_in_background_and_failures_keep_the_old_value():
+    gate = threading.Event()
+    calls = []
+
+    def refresh(v):
+        calls.append(v)
+        gate.wait(2)
+        if v == 2:
+            raise RuntimeError("store unavailable")
+        return v + 1
+
+    r = Refreshing(lambda: 1, refresh, interval=0.05, name="test")
+    assert r.get() == 1
+    time.sleep(0.06)
+
+    assert r.get() == 1          # stale: refresh started, old value served meanwhile
+    assert r.get() == 1 and len(calls) == 1
+    gate.set()
+    assert _wait_for(lambda: r.get() == 2)
+
+    time.sleep(0.06)
+    r.get()                      # this refresh fails
+    assert _wait_for(lambda: len(calls) == 2 and not r._running)
+    assert r.get() == 2
@@ -0,0 +1,99 @@
+import json
+import subprocess
+import sys
+import textwrap
+import threading
+from concurrent.futures import TimeoutError as FutureTimeout
+
+import pytest
+
+from utils import export
+
+# Stand-in for the Chromium renderer: one JSON reply per request line, except that
+# a "hang" request blocks forever (a frozen renderer).
+RENDERER = textwrap.dedent("""
+    import sys, time
+    print('{"code": 0}', flush=True)
+    for line in sys.stdin:
+        if "hang" in line:
+            time.sleep(3600)
+        print('{"code": 0, "result": "png"}', flush=True)
+""")
+
+
+class FakeScope:
+    """Mimics kaleido 0.2.1: a shell wrapper runs the renderer as a child process."""
+
+    def __init__(self, script):
+        self.script = script
+        self._proc = None
+        self._proc_lock = threading.Lock()
+
+    def _ensure_kaleido(self):
+        if self._proc is None or self._proc.poll() is not None:
+            with self._proc_lock:
+                if self._proc is None or self._proc.poll() is not None:
+                    # like kaleido/executable/kaleido: bash stays the parent ("; :" stops exec)
+                    self._proc = subprocess.Popen(
+                        ["bash", "-c", f'"{sys.executable}" "{self.script}"; :'],
+                        stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+                    self._proc.stdout.readline()
+
+    def transform(self, fig, **kwargs):
+        self._ensure_kaleido()
+        with self._proc_lock:
+            self._proc.stdin.write((json.dumps({"data": fig}) + "\n").encode())
+            self._proc.stdin.flush()
+            response = self._proc.stdout.readline()
+        if not response:
+            raise ValueError("Transform failed. Error stream:\n\n")
+        return json.loads(response)["result"].encode()
+
+    def _shutdown_kaleido(self):
+        with self._proc_lock:
+            if self._proc is not None:
+                self._proc.kill()
+                self._proc.wait()
+                self._proc = None
+
+
+@pytest.fixture
+def scope(tmp_path, monkeypatch):
+    script = tmp_path / "renderer.py"
+    script.write_text(RENDERER)
+    fake = FakeScope(str(script))
+    monkeypatch.setattr(export, "_scope", lambda: fake)
+    monkeypatch.setattr(export.pio, "to_image", lambda fig, **kw: fake.transform(fig))
+    yield fake
+    fake._shutdown_kaleido()
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="process tree via /proc")
+def test_frozen_renderer_is_killed_and_next_export_succeeds(scope):
+    assert export.to_image("ok", timeout=5) == b"png"
+    renderer = export._descendants(scope._proc.pid)
+    assert renderer
+
+    with pytest.raises(FutureTimeout):
+        export.to_image("hang", timeout=0.5)
+
+    assert export.to_image("ok", timeout=5) == b"png"
+    assert not set(renderer) & set(export._descendants(scope._proc.pid))
+
+
+def test_queue_wait_does_not_count_against_the_timeout(scope, monkeypatch):
+    release = threading.Event()
+    real = export.pio.to_image
+
+    def slow_first(fig, **kw):
+        if fig == "slow":
+            release.wait(5)
+        return real(fig, **kw)
+
+    monkeypatch.setattr(export.pio, "to_image", slow_first)
+    ahead = export._executor.submit(export._render, "slow", "png", 10, 10, 1)
+    threading.Timer(1.0, release.set).start()
+
+    # queued ~1s behind the slow job, runs in well under its own 0.8s budget
+    assert export.to_image("ok", timeout=0.8) == b"png"
+    assert ahead.result() == b"png"
@@ -0,0 +1,65 @@
+from datetime import date
+
+import pytest
+
+from utils.history import HistoryStore, quarter_bounds
+from utils.scoring import level_deltas
+
+
+def test_access_code_is_issued_once_and_checked(tmp_path):
+    store = HistoryStore(str(tmp_path / "h.sqlite3"))
+
+    code = store.issue_code(" Acme ")
+
+    assert code
+    assert store.issue_code("Acme") is None
+    assert store.check_code("Acme", code)
+    assert not store.check_code("Acme", "")
+    assert not store.check_code("Acme", code + "x")
+    assert not store.check_code("Other", code)
+
+    fresh = store.issue_code("Acme", replace=True)
+    assert store.check_code("Acme", fresh) and not store.check_code("Acme", code)
+    store.close()
+
+
+def test_movers_compares_with_the_previous_assessment(tmp_path):
+    store = HistoryStore(str(tmp_path / "h.sqlite3"))
+    store.save("A", {"TRL": 3}, taken_at="2026-03-20T10:00:00+00:00")
+    store.save("A", {"TRL": 5}, taken_at="2026-05-02T10:00:00+00:00")   # +2 in Q2
+    store.save("A", {"TRL": 6}, taken_at="2026-06-10T10:00:00+00:00")   # +1 in Q2
+    store.save("B", {"TRL": 7}, taken_at="2026-04-11T10:00:00+00:00")   # first assessment
+    store.save("C", {"TRL": 4}, taken_at="2026-01-05T10:00:00+00:00")
+    store.save("C", {"TRL": 4}, taken_at="2026-04-15T10:00:00+00:00")   # no change
+    store.save("D", {"CRL": 2}, taken_at="2026-02-01T10:00:00+00:00")   # TRL not reached before
+    store.save("D", {"TRL": 5}, taken_at="2026-04-20T10:00:00+00:00")
+
+    movers = store.movers("TRL", "2026-04-01", "2026-07-01")
+
+    assert [(m["startup"], m["previous"], m["level"]) for m in movers] == [("A", 3, 5), ("A", 5, 6)]
+    assert [m["startup"] for m in store.movers("TRL", "2026-04-01", "2026-07-01", min_delta=2)] == ["A"]
+    assert store.movers("TRL", "2026-07-01", "2026-10-01") == []
+    store.close()
+
+
+def test_movers_rejects_unknown_dimensions(tmp_path):
+    store = HistoryStore(str(tmp_path / "h.sqlite3"))
+    with pytest.raises(ValueError):
+        store.movers("TRL; DROP TABLE assessments", "2026-01-01", "2026-04-01")
+    store.close()
+
+
+@pytest.mark.parametrize("today, back, expected", [
+    (date(2026, 5, 17), 1, ("2026-01-01", "2026-04-01")),
+    (date(2026, 1, 1), 1, ("2025-10-01", "2026-01-01")),     # previous year
+    (date(2026, 2, 28), 0, ("2026-01-01", "2026-04-01")),
+    (date(2026, 12, 31), 0, ("2026-10-01", "2027-01-01")),   # end bound rolls into next year
+    (date(2026, 3, 31), 5, ("2024-10-01", "2025-01-01")),
+])
+def test_quarter_bounds(today, back, expected):
+    assert quarter_bounds(today, back) == expected
+
+
+def test_level_deltas_only_covers_dimensions_in_both():
+    assert level_deltas({"CRL": 3, "TRL": 5, "BRL": 2}, {"CRL": 4, "TRL": 5, "FRL": 1}) == {"CRL": 1, "TRL": 0}
+    assert level_deltas({}, {"CRL": 4}) == {}
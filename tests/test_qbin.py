@@ -0,0 +1,60 @@
+import os
+import shutil
+
+import pytest
+
+from utils import qbin
+from utils.scoring import load_questions, load_rl_descriptions
+
+DATA = os.path.join(os.path.dirname(__file__), "..", "data")
+
+
+@pytest.fixture
+def variant_dir(tmp_path):
+    for name in ("questions.csv", "rl_descriptions.csv"):
+        shutil.copy(os.path.join(DATA, name), tmp_path / name)
+    return str(tmp_path)
+
+
+def _plain(rl_text):
+    return {dim: {lvl: dict(info) for lvl, info in lvls.items()} for dim, lvls in rl_text.items()}
+
+
+def test_round_trip_matches_csv_sources(variant_dir):
+    out = qbin.build(variant_dir)
+    qpath = os.path.join(variant_dir, "questions.csv")
+    rlpath = os.path.join(variant_dir, "rl_descriptions.csv")
+
+    rows, rl_text = qbin.read_bin(out, qbin.source_hash(qpath, rlpath))
+
+    assert [dict(r) for r in rows] == load_questions(qpath).to_dict("records")
+    assert _plain(rl_text) == load_rl_descriptions(rlpath)
+
+
+def test_zero_score_round_trips(tmp_path):
+    rows = [{"id": "1", "dimension": "CRL", "field": "f", "terminal": "",
+             "option_1": "a", "score_1": "0", "next_1": "",
+             "option_2": "b", "score_2": "", "next_2": "2",
+             "option_3": "", "score_3": "", "next_3": "",
+             "option_4": "", "score_4": "", "next_4": ""}]
+    out = str(tmp_path / qbin.BIN_NAME)
+    qbin.write_bin(out, rows, {}, b"\0" * 32)
+
+    got, _ = qbin.read_bin(out)
+
+    assert [dict(r) for r in got] == rows
+
+
+def test_stale_or_truncated_file_is_ignored(variant_dir):
+    out = qbin.build(variant_dir)
+    digest = qbin.source_hash(os.path.join(variant_dir, "questions.csv"),
+                              os.path.join(variant_dir, "rl_descriptions.csv"))
+
+    assert qbin.read_bin(out, b"x" * 32) is None
+
+    with open(out, "rb") as f:
+        data = f.read()
+    for cut in (len(data) - 1, len(data) // 2, qbin._HEADER.size + 3):
+        with open(out, "wb") as f:
+            f.write(data[:cut])
+        assert qbin.read_bin(out, digest) is None
@@ -0,0 +1,55 @@
+import os
+import shutil
+
+import pytest
+
+from utils import questionnaire
+
+DATA = os.path.join(os.path.dirname(__file__), "..", "data")
+
+
+@pytest.fixture
+def variant(tmp_path, monkeypatch):
+    """A registry with a single "t" variant backed by copies of the default CSVs."""
+    paths = (str(tmp_path / "questions.csv"), str(tmp_path / "rl_descriptions.csv"))
+    for src, dst in zip(("questions.csv", "rl_descriptions.csv"), paths):
+        shutil.copy(os.path.join(DATA, src), dst)
+    monkeypatch.setattr(questionnaire, "_VARIANTS", {"t": paths})
+    monkeypatch.setattr(questionnaire, "_compiled", {})
+    monkeypatch.setattr(questionnaire, "_stamps", {})
+    monkeypatch.setattr(questionnaire, "discover_variants", lambda: {"t": paths})
+    return paths
+
+
+def _rewrite(path, keep):
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text[:keep(len(text))])
+    os.utime(path, ns=(1, 1))   # force a new stamp even within the mtime resolution
+
+
+def test_truncated_questions_keep_old_snapshot(variant):
+    old = questionnaire.get_questionnaire("t")
+    _rewrite(variant[0], lambda n: n // 3)
+
+    assert questionnaire.reload_changed() == []
+    assert questionnaire.get_questionnaire("t") is old
+
+
+def test_half_written_descriptions_keep_old_snapshot(variant):
+    old = questionnaire.get_questionnaire("t")
+    for keep in (lambda n: 0, lambda n: 20):
+        _rewrite(variant[1], keep)
+        assert questionnaire.reload_changed() == []
+        assert questionnaire.get_questionnaire("t") is old
+
+
+def test_valid_edit_is_swapped_in(variant):
+    old = questionnaire.get_questionnaire("t")
+    with open(variant[1], "a", encoding="utf-8") as f:
+        f.write('\nCRL,10,"Extra","Extra level"\n')
+
+    assert questionnaire.reload_changed() == ["t"]
+    new = questionnaire.get_questionnaire("t")
+    assert new is not old and 10 in new.rl_text["CRL"]
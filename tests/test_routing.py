@@ -0,0 +1,38 @@
+from utils.questionnaire import build_questionnaire, get_questionnaire
+from utils.routing import Router, compare, dimension_chains, synthetic_profiles
+
+
+def test_adaptive_routing_keeps_final_levels_and_asks_fewer_questions():
+    qn = get_questionnaire()
+
+    res = compare(qn, synthetic_profiles(2000, list(dimension_chains(qn))))
+
+    assert res["final_level_mismatches"] == 0
+    assert res["avg_questions_adaptive"] < res["avg_questions_top_down"]
+
+
+def _row(qid, dim, options):
+    row = {"id": qid, "dimension": dim, "field": dim, "terminal": ""}
+    for i in range(1, 5):
+        label, score, nxt = options[i - 1] if i <= len(options) else ("", "", "")
+        row.update({f"option_{i}": label, f"score_{i}": score, f"next_{i}": nxt})
+    return row
+
+
+def test_learned_counts_are_found_for_chains_of_different_length():
+    # X has four level bands, Y only two: X's band (the context for Y) can exceed Y's chain
+    rows = [
+        _row("1", "X", [("a", "9", "5"), ("none", "", "2")]),
+        _row("2", "X", [("a", "7", "5"), ("none", "", "3")]),
+        _row("3", "X", [("a", "5", "5"), ("none", "", "4")]),
+        _row("4", "X", [("a", "3", "5"), ("b", "1", "5")]),
+        _row("5", "Y", [("a", "9", ""), ("none", "", "6")]),
+        _row("6", "Y", [("a", "5", ""), ("b", "1", "")]),
+    ]
+    qn = build_questionnaire("t", rows, {})
+    # low X always comes with the top Y band, high X never does
+    profiles = [{"X": 3, "Y": 9}] * 40 + [{"X": 9, "Y": 5}] * 40
+
+    p = Router(qn, profiles).distribution("Y", {"X": 3})
+
+    assert p[0] > 0.9
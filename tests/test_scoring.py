@@ -0,0 +1,22 @@
+import random
+
+from utils.scoring import DIMENSIONS, compute_final_levels, record_score, undo_score
+
+
+def test_incremental_levels_match_full_recompute():
+    """Random confirm/back sequences keep final_levels == compute_final_levels(history)."""
+    rnd = random.Random(1234)
+    for _ in range(200):
+        history, final, stack = {}, {}, []
+        for _ in range(rnd.randint(1, 60)):
+            if stack and rnd.random() < 0.35:
+                undo_score(history, final, *stack.pop())
+            else:
+                step = (rnd.choice(DIMENSIONS), rnd.randint(1, 9))
+                record_score(history, final, *step)
+                stack.append(step)
+            assert final == compute_final_levels(history)
+        while stack:
+            undo_score(history, final, *stack.pop())
+            assert final == compute_final_levels(history)
+        assert final == {}
@@ -0,0 +1,24 @@
+import pytest
+
+from utils.questionnaire import get_questionnaire
+from utils.search import index_for, stem
+
+
+@pytest.mark.parametrize("singular, plural", [
+    ("sale", "sales"), ("price", "prices"), ("service", "services"), ("customer", "customers"),
+    ("box", "boxes"), ("match", "matches"), ("process", "processes"), ("company", "companies"),
+])
+def test_plural_stems_like_singular(singular, plural):
+    assert stem(singular) == stem(plural)
+
+
+@pytest.mark.parametrize("singular, plural", [
+    ("sale", "sales"), ("price", "prices"), ("service", "services"), ("customer", "customers"),
+])
+def test_singular_and_plural_queries_return_same_hits(singular, plural):
+    idx = index_for(get_questionnaire())
+
+    one = [h["id"] for h in idx.search(singular, k=20)]
+
+    assert one
+    assert one == [h["id"] for h in idx.search(plural, k=20)]
@@ -0,0 +1,75 @@
+import random
+
+import numpy as np
+import pytest
+
+from utils import similarity
+from utils.scoring import DIMENSIONS
+from utils.similarity import ProfileIndex
+
+
+def _rows(n, seed=3, start_id=1):
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(start_id, start_id + n):
+        # few distinct profiles, so the bucketed path actually collapses them
+        base = rnd.randint(1, 4)
+        levels = [base if rnd.random() < 0.95 else None for _ in DIMENSIONS]
+        rows.append((i, f"s{i % 97}", f"c{i % 7}" if i % 50 else "rare", "default",
+                     f"2026-{1 + i % 12:02d}-15T09:00:00+00:00", *levels))
+    return rows
+
+
+def _brute(rows, levels, k, cohort=None, since=None, until=None, exclude_startup=None):
+    q = np.array([levels.get(d, 0) for d in DIMENSIONS])
+    hits = []
+    for r in rows:
+        if cohort and r[2] != cohort or exclude_startup and r[1] == exclude_startup:
+            continue
+        if since and r[4][:10] < since or until and r[4][:10] >= until:
+            continue
+        v = np.array([x or 0 for x in r[5:]])
+        hits.append(float(np.sqrt(((v - q) ** 2).sum())))
+    return sorted(hits)[:k]
+
+
+QUERIES = [
+    dict(levels={"CRL": 3, "TRL": 4}, k=5),
+    dict(levels={d: 2 for d in DIMENSIONS}, k=25, cohort="c3"),
+    dict(levels={"FRL": 9}, k=4, cohort="rare"),                        # selective filter
+    dict(levels={"BRL": 1}, k=10, since="2026-03-01", until="2026-05-01", exclude_startup="s5"),
+    dict(levels={"SRL": 5}, k=3, cohort="no-such-cohort"),
+]
+
+
+@pytest.mark.parametrize("threshold", [10 ** 9, 100], ids=["exact", "bucketed"])
+@pytest.mark.parametrize("query", QUERIES)
+def test_query_matches_brute_force(monkeypatch, threshold, query):
+    monkeypatch.setattr(similarity, "BUCKET_THRESHOLD", threshold)
+    rows = _rows(3000)
+    idx = ProfileIndex.from_rows(rows)
+    assert idx._bucketed == (threshold == 100)
+
+    hits = idx.query(**query)
+
+    assert [h["distance"] for h in hits] == pytest.approx(_brute(rows, **query))
+    for h in hits:
+        assert not query.get("cohort") or h["cohort"] == query["cohort"]
+        assert h["startup"] != query.get("exclude_startup")
+
+
+def test_records_rows_and_extend_build_the_same_index():
+    rows = _rows(500)
+    records = [{"id": r[0], "startup": r[1], "cohort": r[2], "taken_at": r[4],
+                "levels": {d: v for d, v in zip(DIMENSIONS, r[5:]) if v is not None}} for r in rows]
+    full = ProfileIndex(records)
+    grown = ProfileIndex.from_rows(rows[:200]).extend(rows[200:])
+
+    assert grown.max_id == full.max_id == 500
+    for query in QUERIES:
+        assert grown.query(**query) == full.query(**query)
+
+
+def test_empty_index():
+    assert ProfileIndex.from_rows([]).query({"CRL": 1}) == []
+    assert ProfileIndex([]).max_id == 0
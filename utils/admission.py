@@ -0,0 +1,110 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class Busy(Exception):
+    """The queue for this class of work is full; ask the user to retry shortly."""
+
+
+class Gate:
+    """
+    Admission control for one class of work: at most `max_active` jobs run at once,
+    up to `max_queue` sessions wait in arrival order, anyone beyond that gets Busy.
+
+    Streamlit runs at most one script per session, so a FIFO over sessions is
+    already fair per session. A session whose run is interrupted while waiting
+    (user clicked something, page rerun) keeps its place for `grace_s` seconds.
+    """
+
+    def __init__(self, name: str, max_active: int, max_queue: int, grace_s: float = 30.0):
+        self.name = name
+        self.max_active = max_active
+        self.max_queue = max_queue
+        self.grace_s = grace_s
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting: dict[str, float] = {}             # session -> arrival (queue order)
+        self._left: dict[str, tuple[float, float]] = {}  # session -> (arrival, left_at)
+        self._durations: deque[float] = deque(maxlen=50)
+
+    def _arrival(self, session_id: str, now: float) -> float:
+        arrival, left_at = self._left.pop(session_id, (now, now))
+        if now - left_at > self.grace_s:
+            arrival = now
+        # drop stale grace entries while we hold the lock anyway
+        for sid in [s for s, (_, t) in self._left.items() if now - t > self.grace_s]:
+            del self._left[sid]
+        return arrival
+
+    def _ahead(self, session_id: str) -> int:
+        mine = self._waiting[session_id]
+        return sum(1 for t in self._waiting.values() if t < mine)
+
+    def eta(self, position: int) -> float:
+        """Rough seconds until a job at queue `position` (0 = next) starts."""
+        avg = sum(self._durations) / len(self._durations) if self._durations else 5.0
+        return (position // max(1, self.max_active) + 1) * avg
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {"active": self._active, "waiting": len(self._waiting),
+                    "avg_job_s": sum(self._durations) / len(self._durations) if self._durations else 0.0}
+
+    @contextmanager
+    def slot(self, session_id: str, on_wait=None, poll: float = 0.5):
+        """
+        Run the body once admitted. While queued, on_wait(position, eta_s) is called
+        about every `poll` seconds (position 1 = next in line) outside the lock, so it
+        may update the UI or raise to abandon the wait.
+        """
+        with self._cond:
+            if session_id not in self._waiting:
+                if len(self._waiting) >= self.max_queue:
+                    raise Busy(self.name)
+                self._waiting[session_id] = self._arrival(session_id, time.monotonic())
+
+        admitted = False
+        try:
+            while True:
+                with self._cond:
+                    ahead = self._ahead(session_id)
+                    if ahead == 0 and self._active < self.max_active:
+                        del self._waiting[session_id]
+                        self._active += 1
+                        admitted = True
+                        break
+                    self._cond.wait(poll)
+                    ahead = self._ahead(session_id)
+                if on_wait:
+                    on_wait(ahead + 1, self.eta(ahead))
+        except BaseException:
+            with self._cond:
+                if not admitted:
+                    arrival = self._waiting.pop(session_id, None)
+                    if arrival is not None:
+                        self._left[session_id] = (arrival, time.monotonic())
+                    self._cond.notify_all()
+            raise
+
+        t0 = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._durations.append(time.monotonic() - t0)
+                self._cond.notify_all()
+
+
+# Chart export + PDF build. Kaleido already serialises exports (utils/export.py);
+# two slots let one PDF lay out in ReportLab while the next chart renders.
+# Question pages and confirms are not queued: Streamlit gives each session one
+# script thread, and keeping this class bounded is what keeps them responsive.
+EXPENSIVE = Gate(
+    "expensive",
+    max_active=int(os.environ.get("SRA_EXPENSIVE_SLOTS", "2")),
+    max_queue=int(os.environ.get("SRA_EXPENSIVE_QUEUE", "300")),
+)
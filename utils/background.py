@@ -0,0 +1,52 @@
+import logging
+import threading
+import time
+from typing import Callable, Generic, TypeVar
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Refreshing(Generic[T]):
+    """
+    A value kept fresh off the request path. The first get() builds it inline; later
+    calls return the current value at once and, once it is older than `interval`
+    seconds, start a single background refresh(value) whose result is swapped in.
+    A failed refresh is logged and the old value kept until the next interval.
+    """
+
+    def __init__(self, build: Callable[[], T], refresh: Callable[[T], T], interval: float, name: str):
+        self.name = name
+        self.interval = interval
+        self._build = build
+        self._refresh = refresh
+        self._lock = threading.Lock()
+        self._value: T | None = None
+        self._at = 0.0
+        self._running = False
+
+    def get(self) -> T:
+        if self._value is None:
+            with self._lock:
+                if self._value is None:
+                    self._value = self._build()
+                    self._at = time.monotonic()
+            return self._value
+        with self._lock:
+            if self._running or time.monotonic() - self._at < self.interval:
+                return self._value
+            self._running = True
+        threading.Thread(target=self._run, name=f"refresh-{self.name}", daemon=True).start()
+        return self._value
+
+    def _run(self) -> None:
+        try:
+            value = self._refresh(self._value)
+        except Exception:
+            log.exception("Refreshing %s failed; keeping the previous value", self.name)
+            value = self._value
+        with self._lock:
+            self._value = value
+            self._at = time.monotonic()
+            self._running = False
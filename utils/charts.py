@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 import plotly.graph_objects as go
 
 FIGMA = {
@@ -6,19 +8,24 @@ FIGMA = {
     "cream": "#FFF9E5",
 }
 
+CATS = ["CRL", "SRL", "BRL", "TMRL", "FRL", "IPRL", "TRL"]
+
+def _to_num(v):
+    try:
+        return float(v)
+    except Exception:
+        return 0.0
+
+def _closed_r(levels: dict) -> list[float]:
+    rvals = [_to_num(levels.get(c, 0)) for c in CATS]
+    return rvals + [rvals[0]]
+
 def radar_chart(levels: dict[str, int | float | str]) -> go.Figure:
-    cats = ["CRL", "SRL", "BRL", "TMRL", "FRL", "IPRL", "TRL"]
+    cats = CATS
     n = len(cats)
     theta_deg = [i * (360 / n) for i in range(n)] + [0]
 
-    def to_num(v):
-        try:
-            return float(v)
-        except Exception:
-            return 0.0
-
-    rvals = [to_num(levels.get(c, 0)) for c in cats]
-    rvals_closed = rvals + [rvals[0]]
+    rvals_closed = _closed_r(levels)
 
     fig = go.Figure()
 
@@ -96,3 +103,75 @@ def radar_chart(levels: dict[str, int | float | str]) -> go.Figure:
     )
 
     return fig
+
+def radar_trend_chart(profiles: list[tuple[str, dict]]) -> go.Figure:
+    """
+    Radar of the latest profile with earlier ones overlaid as fainter outlines.
+    profiles: [(label, levels), ...] oldest first; the last one is drawn as the main polygon.
+    """
+    label, latest = profiles[-1]
+    fig = radar_chart(latest)
+    fig.data[1].name = label
+
+    n = len(CATS)
+    theta_deg = [i * (360 / n) for i in range(n)] + [0]
+    past = profiles[:-1]
+    for k, (lbl, levels) in enumerate(past):
+        alpha = 0.25 + 0.5 * (k + 1) / (len(past) + 1)   # older = fainter
+        fig.add_trace(go.Scatterpolar(
+            r=_closed_r(levels),
+            theta=theta_deg,
+            mode="lines",
+            line=dict(color=f"rgba(220,208,168,{alpha:.2f})", width=2, dash="dot"),
+            name=lbl,
+            hovertemplate=f"{lbl} · %{{customdata}}: %{{r}}<extra></extra>",
+            customdata=CATS + [CATS[0]],
+            showlegend=True,
+        ))
+
+    fig.update_layout(
+        legend=dict(orientation="h", y=-0.05, font=dict(color=FIGMA["cream"])),
+    )
+    return fig
+
+@lru_cache(maxsize=256)
+def _mini_radar(rvals: tuple[float, ...]) -> go.Figure:
+    n = len(CATS)
+    fig = go.Figure(go.Scatterpolar(
+        r=list(rvals) + [rvals[0]],
+        theta=[i * (360 / n) for i in range(n)] + [0],
+        mode="lines",
+        fill="toself",
+        line=dict(color="rgba(255,249,229,0.95)", width=2),
+        fillcolor="rgba(255,249,229,0.55)",
+        hoverinfo="skip",
+        showlegend=False,
+    ))
+    fig.update_layout(
+        polar=dict(
+            bgcolor=FIGMA["teal"],
+            angularaxis=dict(
+                rotation=0,
+                direction="clockwise",
+                tickmode="array",
+                tickvals=[i * (360 / n) for i in range(n)],
+                ticktext=CATS,
+                tickfont=dict(color=FIGMA["cream"], size=10),
+                gridcolor="rgba(255,249,229,0.35)",
+            ),
+            radialaxis=dict(range=[0, 9], showticklabels=False, ticks="",
+                            gridcolor="rgba(255,249,229,0.35)"),
+        ),
+        paper_bgcolor=FIGMA["bg"],
+        margin=dict(l=30, r=30, t=20, b=20),
+        height=240,
+    )
+    return fig
+
+def mini_radar(levels: dict) -> go.Figure:
+    """
+    Small single-trace radar for the live sidebar. Figures are cached per profile
+    (the 256 most recently used, process-wide), so a rerun with unchanged levels
+    reuses the same figure. Treat the result as read-only.
+    """
+    return _mini_radar(tuple(_to_num(levels.get(c, 0)) for c in CATS))
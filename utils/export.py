@@ -0,0 +1,197 @@
+import json
+import logging
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+log = logging.getLogger(__name__)
+
+# Kaleido 0.2.x keeps ONE Chromium subprocess alive behind pio.kaleido.scope and
+# feeds it jobs over stdin/stdout. We own that process here: warm it up at app
+# start, push every export through a single worker thread (the scope is not
+# meant to be hammered concurrently), and recycle it when it misbehaves.
+RENDER_TIMEOUT_S = 30           # per-job timeout, counted from when the job starts running
+QUEUE_TIMEOUT_S = 120           # give up on a job that hasn't started after this long
+MAX_JOBS_PER_PROCESS = 250      # recycle Chromium periodically (its memory only grows)
+STATS_LOG_EVERY = 50            # log a latency/failure summary every N successful renders
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kaleido")
+_lock = threading.Lock()
+_stats = {
+    "renders": 0,        # successful exports
+    "failures": 0,       # exports that raised
+    "timeouts": 0,       # exports that hit RENDER_TIMEOUT_S or QUEUE_TIMEOUT_S
+    "restarts": 0,       # times we shut Chromium down
+    "last_ms": 0.0,
+    "max_ms": 0.0,
+    "total_ms": 0.0,
+}
+_jobs_since_restart = 0
+
+
+def _scope():
+    return getattr(pio.kaleido, "scope", None)
+
+
+def _count_restart(reason: str):
+    global _jobs_since_restart
+    with _lock:
+        _stats["restarts"] += 1
+        _jobs_since_restart = 0
+    log.warning("Kaleido renderer restarted (%s)", reason)
+
+
+def _descendants(pid: int) -> list[int]:
+    """Child processes of `pid`, deepest first (Linux /proc; empty where unavailable)."""
+    out = []
+    try:
+        tasks = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return out
+    for tid in tasks:
+        try:
+            with open(f"/proc/{pid}/task/{tid}/children") as f:
+                kids = [int(c) for c in f.read().split()]
+        except (OSError, ValueError):
+            continue
+        for kid in kids:
+            out.extend(_descendants(kid))
+            out.append(kid)
+    return out
+
+
+def _kill(reason: str):
+    """
+    Hard-kill the Kaleido process tree without touching scope._proc_lock: a hung job
+    holds that lock while blocked on stdout.readline(), so _shutdown_kaleido() would
+    wait for it. On Linux scope._proc is the kaleido/executable/kaleido shell wrapper
+    and Chromium runs as its child holding the same stdout, so the children go first;
+    once nothing holds the pipe the blocked read gets EOF, the job fails, and the
+    next job's _ensure_kaleido() starts a fresh process.
+    """
+    proc = getattr(_scope(), "_proc", None)
+    if proc is not None and proc.poll() is None:
+        # collect before killing the wrapper: orphans get re-parented and drop out of /proc/<pid>
+        for pid in _descendants(proc.pid):
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except OSError:
+                pass
+        try:
+            proc.kill()
+            proc.wait(timeout=5)    # reaped, so _ensure_kaleido() sees it as gone
+        except Exception:
+            log.exception("Killing Kaleido failed")
+    _count_restart(reason)
+
+
+def _process_broken(exc: Exception) -> bool:
+    """True for process/transport failures; False for bad figures or export errors."""
+    proc = getattr(_scope(), "_proc", None)
+    if proc is not None and proc.poll() is not None:
+        return True
+    if isinstance(exc, (OSError, json.JSONDecodeError)):
+        return True
+    # kaleido 0.2 reports an empty reply / failed start as ValueError carrying the stderr dump
+    return isinstance(exc, ValueError) and "Error stream" in str(exc)
+
+
+def _bump_jobs():
+    global _jobs_since_restart
+    with _lock:
+        _jobs_since_restart += 1
+
+
+def _render(fig, fmt: str, width: int, height: int, scale: float,
+            started: threading.Event | None = None) -> bytes:
+    if started is not None:
+        started.set()
+    if _jobs_since_restart >= MAX_JOBS_PER_PROCESS:
+        # runs on the export thread, so no job holds the lock: a graceful shutdown is fine
+        scope = _scope()
+        if scope is not None and hasattr(scope, "_shutdown_kaleido"):
+            scope._shutdown_kaleido()
+        _count_restart(f"recycled after {MAX_JOBS_PER_PROCESS} jobs")
+    try:
+        return pio.to_image(fig, format=fmt, width=width, height=height, scale=scale)
+    finally:
+        _bump_jobs()
+
+
+def to_image(fig, fmt: str = "png", width: int = 600, height: int = 600,
+             scale: float = 1, timeout: float = RENDER_TIMEOUT_S) -> bytes:
+    """
+    Export a figure through the shared Kaleido process.
+    Raises on failure/timeout (callers decide how to degrade); the error is logged
+    and counted here so it doesn't disappear into a bare `except`.
+    """
+    t0 = time.perf_counter()
+    started = threading.Event()
+    fut = _executor.submit(_render, fig, fmt, width, height, scale, started)
+    try:
+        # the timeout counts from when our job starts: waiting behind another export
+        # (itself bounded by its own timeout) must not get a healthy job killed
+        if not started.wait(QUEUE_TIMEOUT_S) and fut.cancel():
+            with _lock:
+                _stats["timeouts"] += 1
+            log.error("Kaleido export did not start within %.0fs (%s)", QUEUE_TIMEOUT_S, _stats_line())
+            raise FutureTimeout()
+        img = fut.result(timeout=timeout)
+    except FutureTimeout:
+        if fut.cancelled():
+            raise
+        with _lock:
+            _stats["timeouts"] += 1
+        log.error("Kaleido export timed out after %.1fs (%s)", timeout, _stats_line())
+        if not fut.cancel():
+            # our job is the one stuck in Chromium: kill it so the export thread frees up
+            _kill("timeout")
+        raise
+    except Exception as exc:
+        with _lock:
+            _stats["failures"] += 1
+        log.exception("Kaleido export failed (%s)", _stats_line())
+        if _process_broken(exc):
+            _kill("process failure")
+        raise
+
+    ms = (time.perf_counter() - t0) * 1000
+    with _lock:
+        _stats["renders"] += 1
+        _stats["last_ms"] = ms
+        _stats["max_ms"] = max(_stats["max_ms"], ms)
+        _stats["total_ms"] += ms
+        renders = _stats["renders"]
+    if renders % STATS_LOG_EVERY == 0:
+        log.info("Kaleido renderer: %s", _stats_line())
+    return img
+
+
+def warm_up() -> bool:
+    """Start Chromium and render a throwaway figure so the first real export is fast."""
+    try:
+        to_image(go.Figure(), width=10, height=10)
+    except Exception:
+        log.warning("Kaleido warm-up failed; PDFs will fall back to text only until it recovers")
+        return False
+    log.info("Kaleido renderer warm (%s)", _stats_line())
+    return True
+
+
+def render_stats() -> dict:
+    """Snapshot of latency / failure counters (avg_ms over successful renders)."""
+    with _lock:
+        out = dict(_stats)
+    out["avg_ms"] = out["total_ms"] / out["renders"] if out["renders"] else 0.0
+    return out
+
+
+def _stats_line() -> str:
+    st = render_stats()
+    return ("{renders} ok, {failures} failed, {timeouts} timed out, {restarts} restarts, "
+            "last {last_ms:.0f}ms, avg {avg_ms:.0f}ms, max {max_ms:.0f}ms").format(**st)
@@ -0,0 +1,171 @@
+import hashlib
+import hmac
+import os
+import secrets
+import sqlite3
+import sys
+import threading
+from datetime import date, datetime, timezone
+
+from utils.scoring import DIMENSIONS
+
+DB_PATH = os.environ.get("SRA_HISTORY_DB", "data/history.sqlite3")
+
+# One row per completed assessment, one column per dimension (NULL = not reached).
+# (startup, taken_at) serves "full history of X" and the previous-assessment probe in
+# movers(); taken_at alone serves date-range scans.
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS assessments (
+    id        INTEGER PRIMARY KEY,
+    startup   TEXT NOT NULL,
+    cohort    TEXT NOT NULL DEFAULT '',
+    variant   TEXT NOT NULL DEFAULT 'default',
+    taken_at  TEXT NOT NULL,            -- ISO-8601 UTC, e.g. 2026-10-19T08:30:00+00:00
+    {", ".join(f"{d} INTEGER" for d in DIMENSIONS)}
+);
+CREATE INDEX IF NOT EXISTS ix_assessments_startup_time ON assessments(startup, taken_at);
+CREATE INDEX IF NOT EXISTS ix_assessments_time ON assessments(taken_at);
+
+-- Access code per startup name; only its hash is kept. Whoever holds the code may
+-- save under that name and see its history.
+CREATE TABLE IF NOT EXISTS startups (
+    startup    TEXT PRIMARY KEY,
+    code_hash  TEXT NOT NULL,
+    issued_at  TEXT NOT NULL
+);
+"""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _hash_code(code: str) -> str:
+    return hashlib.sha256(code.strip().encode()).hexdigest()
+
+
+def quarter_bounds(today: date | None = None, back: int = 1) -> tuple[str, str]:
+    """[start, end) ISO dates of the calendar quarter `back` quarters before today's."""
+    today = today or datetime.now(timezone.utc).date()
+    q = (today.year * 4 + (today.month - 1) // 3) - back
+    start = date(q // 4, (q % 4) * 3 + 1, 1)
+    q += 1
+    end = date(q // 4, (q % 4) * 3 + 1, 1)
+    return start.isoformat(), end.isoformat()
+
+
+class HistoryStore:
+    """Assessment history in SQLite; safe to share across Streamlit sessions."""
+
+    def __init__(self, path: str = DB_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def _rows(self, sql: str, params=()) -> list[dict]:
+        with self._lock:
+            return [dict(r) for r in self._conn.execute(sql, params)]
+
+    @staticmethod
+    def _record(row: dict) -> dict:
+        """Row -> {..., "levels": {dim: level}} with unreached dimensions dropped."""
+        levels = {d: row.pop(d) for d in DIMENSIONS}
+        row["levels"] = {d: v for d, v in levels.items() if v is not None}
+        return row
+
+    def issue_code(self, startup: str, replace: bool = False) -> str | None:
+        """
+        New access code for `startup`. Returns None if the name already has one,
+        unless `replace` (programme staff re-issuing a lost code).
+        """
+        code = secrets.token_urlsafe(9)
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                f"{verb} INTO startups (startup, code_hash, issued_at) VALUES (?, ?, ?)",
+                (startup.strip(), _hash_code(code), _now()),
+            )
+        return code if cur.rowcount else None
+
+    def check_code(self, startup: str, code: str) -> bool:
+        rows = self._rows("SELECT code_hash FROM startups WHERE startup = ?", (startup.strip(),))
+        return bool(rows and code.strip()) and hmac.compare_digest(rows[0]["code_hash"], _hash_code(code))
+
+    def save(self, startup: str, levels: dict[str, int], cohort: str = "",
+             variant: str = "default", taken_at: str | None = None) -> int:
+        cols = ["startup", "cohort", "variant", "taken_at"] + DIMENSIONS
+        vals = [startup.strip(), cohort.strip(), variant, taken_at or _now()]
+        vals += [int(levels[d]) if d in levels else None for d in DIMENSIONS]
+        sql = f"INSERT INTO assessments ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})"
+        with self._lock, self._conn:
+            return self._conn.execute(sql, vals).lastrowid
+
+    def get(self, assessment_id: int) -> dict | None:
+        rows = self._rows("SELECT * FROM assessments WHERE id = ?", (assessment_id,))
+        return self._record(rows[0]) if rows else None
+
+    def history(self, startup: str) -> list[dict]:
+        """All assessments of one startup, oldest first."""
+        rows = self._rows(
+            "SELECT * FROM assessments WHERE startup = ? ORDER BY taken_at", (startup.strip(),)
+        )
+        return [self._record(r) for r in rows]
+
+    def all_records(self) -> list[dict]:
+        """Every stored assessment (used to build the peer-similarity index)."""
+        return [self._record(r) for r in self._rows("SELECT * FROM assessments")]
+
+    def profile_rows(self, after_id: int = 0, variant: str | None = None) -> list[tuple]:
+        """
+        Plain (id, startup, cohort, variant, taken_at, *levels) tuples in DIMENSIONS
+        order (None = not reached), id > after_id in id order, for bulk and
+        incremental loads such as the peer index.
+        """
+        sql = f"SELECT id, startup, cohort, variant, taken_at, {', '.join(DIMENSIONS)} FROM assessments WHERE id > ?"
+        params: tuple = (after_id,)
+        if variant is not None:
+            sql += " AND variant = ?"
+            params += (variant,)
+        sql += " ORDER BY id"
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.row_factory = None
+            return cur.execute(sql, params).fetchall()
+
+    def movers(self, dim: str, since: str, until: str, min_delta: int = 1) -> list[dict]:
+        """
+        Assessments taken in [since, until) whose `dim` level went up by at least
+        `min_delta` versus the same startup's previous assessment.
+        e.g. TRL movers last quarter: store.movers("TRL", *quarter_bounds())
+        """
+        if dim not in DIMENSIONS:
+            raise ValueError(f"unknown dimension {dim!r}")
+        # range scan on taken_at, then one (startup, taken_at) index probe per hit
+        sql = f"""
+            SELECT * FROM (
+                SELECT a.id, a.startup, a.cohort, a.taken_at, a.{dim} AS level,
+                       (SELECT p.{dim} FROM assessments p
+                        WHERE p.startup = a.startup AND p.taken_at < a.taken_at
+                        ORDER BY p.taken_at DESC LIMIT 1) AS previous
+                FROM assessments a
+                WHERE a.taken_at >= ? AND a.taken_at < ?
+            )
+            WHERE level - previous >= ?
+            ORDER BY startup, taken_at
+        """
+        return self._rows(sql, (since, until, min_delta))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+if __name__ == "__main__":
+    # python -m utils.history issue "<startup>"   (prints a new access code, replacing the old one)
+    if len(sys.argv) != 3 or sys.argv[1] != "issue":
+        sys.exit('usage: python -m utils.history issue "<startup>"')
+    print(HistoryStore().issue_code(sys.argv[2], replace=True))
@@ -0,0 +1,228 @@
+"""
+Compiled binary form of one questionnaire variant (questions.csv + rl_descriptions.csv).
+
+Layout (little-endian):
+    header   MAGIC, format version, sha256(questions.csv + rl_descriptions.csv), counts
+    nodes    one fixed-width record per question row (string-table indices + scores)
+    descs    one fixed-width record per RL description (dimension, level, title, body)
+    strings  (n + 1) u32 offsets into a UTF-8 blob; string i = blob[off[i]:off[i+1]]
+
+The file is opened with mmap: worker processes share the page cache and long texts
+are only decoded when a page actually shows them.
+
+Build / verify:
+    python -m utils.qbin data                 # writes data/questionnaire.bin
+    python -m utils.qbin data/variants/sv --check
+"""
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Mapping
+
+MAGIC = b"SRQB"
+FORMAT_VERSION = 2
+NO_SCORE = 255                           # score byte for a blank (branch-only) option
+BIN_NAME = "questionnaire.bin"
+
+_HEADER = struct.Struct("<4sHH32sIII")   # magic, version, reserved, sha256, n_nodes, n_descs, n_strings
+_NODE = struct.Struct("<IIII" + "IBI" * 4)  # id, dimension, field, terminal, 4 x (option, score, next)
+_DESC = struct.Struct("<IBII")           # dimension, level, title, body
+
+_TEXT_FIELDS = ("id", "dimension", "field", "terminal")
+
+
+def source_hash(questions_path: str, rl_path: str) -> bytes:
+    h = hashlib.sha256()
+    for p in (questions_path, rl_path):
+        h.update(b"\0")
+        if os.path.isfile(p):
+            with open(p, "rb") as f:
+                h.update(f.read())
+    return h.digest()
+
+
+# ---------------- writing ----------------
+def _score_byte(s: str) -> int:
+    s = str(s).strip()
+    if not s:
+        return NO_SCORE
+    if not s.isdigit() or str(int(s)) != s or int(s) >= NO_SCORE:
+        # only plain 0..254 round-trips exactly; refuse rather than silently rewrite the CSV
+        raise ValueError(f"score {s!r} can't be stored in the binary format")
+    return int(s)
+
+
+def write_bin(out_path: str, rows: list[dict[str, str]], rl_text: dict, digest: bytes) -> None:
+    """Serialize parsed rows + RL texts (as produced by utils.scoring loaders)."""
+    strings: list[str] = []
+    index: dict[str, int] = {}
+
+    def sid(s) -> int:
+        s = "" if s is None else str(s)
+        if s not in index:
+            index[s] = len(strings)
+            strings.append(s)
+        return index[s]
+
+    nodes = []
+    for r in rows:
+        vals = [sid(r.get(k, "")) for k in _TEXT_FIELDS]
+        for i in range(1, 5):
+            vals += [sid(r.get(f"option_{i}", "")), _score_byte(r.get(f"score_{i}", "")),
+                     sid(r.get(f"next_{i}", ""))]
+        nodes.append(_NODE.pack(*vals))
+
+    descs = []
+    for dim, lvls in rl_text.items():
+        for lvl, info in lvls.items():
+            descs.append(_DESC.pack(sid(dim), int(lvl), sid(info.get("title", "")),
+                                    sid(info.get("body", ""))))
+
+    blobs = [s.encode("utf-8") for s in strings]
+    offsets, pos = [], 0
+    for b in blobs:
+        offsets.append(pos)
+        pos += len(b)
+    offsets.append(pos)
+
+    tmp = out_path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0, digest, len(nodes), len(descs), len(strings)))
+        f.writelines(nodes)
+        f.writelines(descs)
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        f.writelines(blobs)
+    os.replace(tmp, out_path)
+
+
+# ---------------- reading ----------------
+class _Strings:
+    """Offset-indexed string table decoded on demand from the mapping."""
+    __slots__ = ("_mm", "_offs", "_base")
+
+    def __init__(self, mm: mmap.mmap, at: int, n: int):
+        self._mm = mm
+        self._offs = struct.unpack_from(f"<{n + 1}I", mm, at)
+        self._base = at + 4 * (n + 1)
+
+    @property
+    def end(self) -> int:
+        """File offset just past the last string."""
+        return self._base + self._offs[-1]
+
+    def valid(self) -> bool:
+        return all(a <= b for a, b in zip(self._offs, self._offs[1:]))
+
+    def __getitem__(self, i: int) -> str:
+        return self._mm[self._base + self._offs[i]:self._base + self._offs[i + 1]].decode("utf-8")
+
+
+class _Record(Mapping):
+    """Read-only row whose values are string-table lookups (or literal scores)."""
+    __slots__ = ("_strings", "_fields")
+
+    def __init__(self, strings: _Strings, fields: dict):
+        self._strings = strings
+        self._fields = fields   # key -> string index, or str for literal values
+
+    def __getitem__(self, key):
+        v = self._fields[key]
+        return v if isinstance(v, str) else self._strings[v]
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+
+def read_bin(path: str, expected_hash: bytes | None = None):
+    """
+    Map a compiled file and return (rows, rl_text) in the same shape the CSV loaders
+    produce. Returns None if the file is missing, foreign, from another format
+    version, truncated/inconsistent with its header, or (when expected_hash is
+    given) built from different CSVs.
+    """
+    try:
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    if len(mm) < _HEADER.size:
+        return None
+    magic, version, _, digest, n_nodes, n_descs, n_strings = _HEADER.unpack_from(mm, 0)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        return None
+    if expected_hash is not None and digest != expected_hash:
+        return None
+
+    at = _HEADER.size
+    table_at = at + n_nodes * _NODE.size + n_descs * _DESC.size
+    # the header counts must account for every byte of the file
+    if len(mm) < table_at + 4 * (n_strings + 1):
+        return None
+    strings = _Strings(mm, table_at, n_strings)
+    if strings.end != len(mm) or not strings.valid():
+        return None
+
+    nodes = list(_NODE.iter_unpack(mm[at:at + n_nodes * _NODE.size]))
+    descs = list(_DESC.iter_unpack(mm[table_at - n_descs * _DESC.size:table_at]))
+    refs = [v for rec in nodes for j, v in enumerate(rec) if j < 4 or (j - 4) % 3 != 1]
+    refs += [v for rec in descs for j, v in enumerate(rec) if j != 1]
+    if refs and max(refs) >= n_strings:
+        return None
+
+    rows = []
+    for rec in nodes:
+        fields = dict(zip(_TEXT_FIELDS, rec[:4]))
+        # ids/nexts are short and used for routing: decode them now
+        fields["id"] = strings[fields["id"]]
+        for i in range(4):
+            opt, score, nxt = rec[4 + 3 * i:7 + 3 * i]
+            fields[f"option_{i + 1}"] = opt
+            fields[f"score_{i + 1}"] = "" if score == NO_SCORE else str(score)
+            fields[f"next_{i + 1}"] = strings[nxt]
+        rows.append(_Record(strings, fields))
+    rl_text: dict = {}
+    for dim, lvl, title, body in descs:
+        rl_text.setdefault(strings[dim], {})[lvl] = _Record(strings, {"title": title, "body": body})
+
+    return rows, rl_text
+
+
+# ---------------- build command ----------------
+def build(variant_dir: str, check: bool = False) -> str:
+    from utils.scoring import load_questions, load_rl_descriptions
+
+    qpath = os.path.join(variant_dir, "questions.csv")
+    rlpath = os.path.join(variant_dir, "rl_descriptions.csv")
+    out = os.path.join(variant_dir, BIN_NAME)
+
+    rows = load_questions(qpath).to_dict("records")
+    rl_text = load_rl_descriptions(rlpath)
+    write_bin(out, rows, rl_text, source_hash(qpath, rlpath))
+
+    if check:
+        loaded = read_bin(out, source_hash(qpath, rlpath))
+        if loaded is None:
+            raise SystemExit(f"{out}: could not be read back")
+        got_rows, got_rl = loaded
+        if [dict(r) for r in got_rows] != rows:
+            raise SystemExit(f"{out}: question rows differ from {qpath}")
+        if {d: {l: dict(i) for l, i in lv.items()} for d, lv in got_rl.items()} != rl_text:
+            raise SystemExit(f"{out}: descriptions differ from {rlpath}")
+    return out
+
+
+if __name__ == "__main__":
+    # python -m utils.qbin [dir ...] [--check]: each dir and every variant under its
+    # variants/ subdir (default: data, i.e. all variants)
+    from utils.questionnaire import discover_variants
+
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    for root in args or ["data"]:
+        for qpath, _ in discover_variants(root).values():
+            print("wrote", build(os.path.dirname(qpath), check="--check" in sys.argv))
@@ -0,0 +1,238 @@
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping
+
+from utils import qbin
+from utils.scoring import load_questions, load_rl_descriptions
+
+log = logging.getLogger(__name__)
+
+DATA_DIR = "data"
+DEFAULT_VARIANT = "default"
+WATCH_INTERVAL_S = 2.0
+
+
+@dataclass(frozen=True, eq=False)
+class Questionnaire:
+    """
+    One questionnaire variant compiled into read-only lookup tables.
+    Built once per process and shared by every session that picked this variant;
+    an edit to the CSVs produces a new snapshot instead of mutating this one.
+    """
+    key: str
+    version: str                                             # short hash of the source CSVs
+    order: tuple[str, ...]                                   # question ids in CSV order
+    rows: Mapping[str, Mapping[str, str]]                    # qid -> CSV row
+    adj: Mapping[str, tuple[str, ...]]                       # qid -> next qids
+    bounds: Mapping[str, tuple[int, int]]                    # qid -> (min, max) steps to finish
+    rl_text: Mapping[str, Mapping[int, Mapping[str, str]]]   # dim -> level -> {title, body}
+
+    @property
+    def start(self) -> str:
+        # Start from the first row in the CSV
+        return self.order[0]
+
+
+def _freeze(d: Mapping) -> Mapping:
+    return MappingProxyType(d)
+
+
+def _compute_bounds(adj: dict[str, tuple[str, ...]]) -> dict[str, tuple[int, int]]:
+    """
+    (min_steps, max_steps) from each qid to FINISH, counting the CURRENT question.
+    A question with no nexts (or an unknown id) counts as 1.
+    """
+    memo: dict[str, tuple[int, int]] = {}
+
+    def walk(qid: str) -> tuple[int, int]:
+        if qid in memo:
+            return memo[qid]
+        nxts = adj.get(qid, ())
+        if not nxts:
+            res = (1, 1)
+        else:
+            mins, maxs = zip(*(walk(nx) for nx in nxts))
+            res = (1 + min(mins), 1 + max(maxs))
+        memo[qid] = res
+        return res
+
+    for qid in adj:
+        walk(qid)
+    return memo
+
+
+def build_questionnaire(key: str, rows: list[dict[str, str]], rl_text: dict,
+                        version: str = "") -> Questionnaire:
+    """Compile parsed question rows + RL texts into a Questionnaire."""
+    order, by_id, adj = [], {}, {}
+    for r in rows:
+        qid = str(r["id"])
+        order.append(qid)
+        by_id[qid] = _freeze(r)
+        adj[qid] = tuple(
+            nx for nx in (str(r.get(f"next_{i}", "")).strip() for i in range(1, 5)) if nx
+        )
+
+    return Questionnaire(
+        key=key,
+        version=version,
+        order=tuple(order),
+        rows=_freeze(by_id),
+        adj=_freeze(adj),
+        bounds=_freeze(_compute_bounds(adj)),
+        rl_text=_freeze({dim: _freeze({lvl: _freeze(info) for lvl, info in lvls.items()})
+                         for dim, lvls in rl_text.items()}),
+    )
+
+
+def compile_questionnaire(key: str, questions_path: str, rl_path: str,
+                          strict: bool = False) -> Questionnaire:
+    """
+    Compile one variant. Uses the mmap'd questionnaire.bin next to the CSVs when it
+    was built from exactly these CSVs (python -m utils.qbin <dir>), else parses the CSVs.
+    With strict=True an unreadable RL descriptions file raises instead of yielding {}.
+    """
+    digest = qbin.source_hash(questions_path, rl_path)
+    bin_path = os.path.join(os.path.dirname(questions_path), qbin.BIN_NAME)
+    loaded = qbin.read_bin(bin_path, digest)
+    if loaded is not None:
+        rows, rl_text = loaded
+    else:
+        rows = load_questions(questions_path).to_dict("records")
+        rl_text = load_rl_descriptions(rl_path, strict=strict)
+    return build_questionnaire(key, rows, rl_text, version=digest.hex()[:12])
+
+
+def validate(qn: Questionnaire) -> None:
+    """
+    Raise ValueError if the snapshot looks like it was compiled from a half-written
+    file: no questions, no level texts, a dimension without level texts, or a next id
+    that doesn't exist.
+    """
+    if not qn.order:
+        raise ValueError(f"{qn.key}: no questions")
+    if not qn.rl_text:
+        raise ValueError(f"{qn.key}: no level descriptions")
+    missing = {r["dimension"].strip().upper() for r in qn.rows.values()} - set(qn.rl_text)
+    if missing:
+        raise ValueError(f"{qn.key}: no level descriptions for {', '.join(sorted(missing))}")
+    dangling = sorted({nx for nxts in qn.adj.values() for nx in nxts if nx not in qn.rows})
+    if dangling:
+        raise ValueError(f"{qn.key}: next ids without a question: {', '.join(dangling)}")
+
+
+def discover_variants(root: str = DATA_DIR) -> dict[str, tuple[str, str]]:
+    """
+    Variant key -> (questions.csv, rl_descriptions.csv).
+    data/questions.csv is "default"; extra variants live in data/variants/<key>/
+    (e.g. data/variants/sv/, data/variants/medtech-en/).
+    """
+    out = {DEFAULT_VARIANT: (os.path.join(root, "questions.csv"),
+                             os.path.join(root, "rl_descriptions.csv"))}
+    vdir = os.path.join(root, "variants")
+    if os.path.isdir(vdir):
+        for key in sorted(os.listdir(vdir)):
+            qpath = os.path.join(vdir, key, "questions.csv")
+            if os.path.isfile(qpath):
+                out[key] = (qpath, os.path.join(vdir, key, "rl_descriptions.csv"))
+    return out
+
+
+# ---- process-wide registry ----
+# Compiled variants live at module level so every Streamlit session (and every
+# worker forked after the first compile) shares the same objects. The watcher
+# thread swaps in a new snapshot when a variant's CSVs change; sessions hold on
+# to the snapshot they started with, so nothing changes under them mid-assessment.
+_VARIANTS = discover_variants()
+_compiled: dict[str, Questionnaire] = {}
+_stamps: dict[str, tuple] = {}      # key -> (mtime, size) of the sources at compile time
+_lock = threading.Lock()
+_watcher: threading.Thread | None = None
+
+
+def _stamp(paths) -> tuple:
+    out = []
+    for p in paths:
+        try:
+            st = os.stat(p)
+            out.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            out.append(None)
+    return tuple(out)
+
+
+def variant_keys() -> list[str]:
+    return list(_VARIANTS)
+
+
+def get_questionnaire(key: str = DEFAULT_VARIANT) -> Questionnaire:
+    """Return the current snapshot of a variant, compiling it on first use only."""
+    if key not in _VARIANTS:
+        key = DEFAULT_VARIANT
+    qn = _compiled.get(key)
+    if qn is None:
+        with _lock:
+            qn = _compiled.get(key)
+            if qn is None:
+                # stamp before reading, so an edit made during the compile is picked up later
+                _stamps[key] = _stamp(_VARIANTS[key])
+                qn = compile_questionnaire(key, *_VARIANTS[key])
+                _compiled[key] = qn
+    return qn
+
+
+def preload_all() -> None:
+    """Compile every variant up front (call before forking workers)."""
+    for key in _VARIANTS:
+        get_questionnaire(key)
+
+
+def reload_changed() -> list[str]:
+    """Recompile variants whose CSVs changed and swap them in; returns the swapped keys."""
+    _VARIANTS.update(discover_variants())
+    swapped = []
+    for key, paths in list(_VARIANTS.items()):
+        if key not in _compiled:
+            continue    # never used yet: compiled lazily from the current files anyway
+        stamp = _stamp(paths)
+        if _stamps.get(key) == stamp:
+            continue
+        try:
+            qn = compile_questionnaire(key, *paths, strict=True)
+            validate(qn)
+        except Exception:
+            # half-saved or broken file: keep serving the old snapshot until the next edit
+            log.exception("Reloading questionnaire %r failed", key)
+            _stamps[key] = stamp
+            continue
+        with _lock:
+            old = _compiled[key]
+            _compiled[key] = qn
+            _stamps[key] = stamp
+        if qn.version != old.version:
+            log.info("Questionnaire %r reloaded: %s -> %s", key, old.version, qn.version)
+            swapped.append(key)
+    return swapped
+
+
+def _watch(interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        try:
+            reload_changed()
+        except Exception:
+            log.exception("Questionnaire watcher iteration failed")
+
+
+def start_watcher(interval: float = WATCH_INTERVAL_S) -> None:
+    """Start the background file watcher (once per process)."""
+    global _watcher
+    with _lock:
+        if _watcher is None or not _watcher.is_alive():
+            _watcher = threading.Thread(target=_watch, args=(interval,),
+                                        name="questionnaire-watcher", daemon=True)
+            _watcher.start()
@@ -0,0 +1,257 @@
+"""
+Adaptive routing: enter each dimension at the question most likely to hold the
+startup's level instead of always at the top (e.g. 101 -> 102 -> 103).
+
+Each dimension is a chain of questions, top level band first, linked by the
+score-less "none of these" option. Entering mid-chain adds an escalation option
+("we are further along") that walks back up, so a consistent respondent still
+lands on exactly the level the top-down walk would give; only the number of
+questions changes. Entering at chain index e when the level sits at index b
+costs |b - e| + 1 questions, so the best entry is the weighted median of the
+predicted band distribution.
+
+Offline comparison against the top-down walk:
+    python -m utils.routing                       # uses the history store if it has data
+    python -m utils.routing --synthetic 5000
+"""
+import random
+import sys
+
+from utils.questionnaire import Questionnaire
+from utils.scoring import record_score
+
+ESCALATE_LABEL = "None of these — we are further along than this"
+
+MIN_SUPPORT = 20        # historical profiles needed before a context's counts are trusted
+PRIOR_WEIGHT = 4.0      # pseudo-counts for the structural prior
+
+
+def dimension_chains(qn: Questionnaire) -> dict[str, tuple[str, ...]]:
+    """dim -> question ids from the highest level band down, in questionnaire order."""
+    down: dict[str, str] = {}
+    for qid, row in qn.rows.items():
+        for i in range(1, 5):
+            nxt = str(row.get(f"next_{i}", "")).strip()
+            score = str(row.get(f"score_{i}", "")).strip()
+            if nxt and not score and nxt in qn.rows and qn.rows[nxt]["dimension"] == row["dimension"]:
+                down[qid] = nxt
+    below = set(down.values())
+    chains = {}
+    for qid in qn.order:
+        dim = qn.rows[qid]["dimension"].strip()
+        if qid in below or dim in chains:
+            continue
+        chain = [qid]
+        while chain[-1] in down and down[chain[-1]] not in chain:
+            chain.append(down[chain[-1]])
+        chains[dim] = tuple(chain)
+    return chains
+
+
+def level_bands(qn: Questionnaire, chains: dict[str, tuple[str, ...]]) -> dict[str, dict[int, int]]:
+    """dim -> level -> index of the chain question that offers that level."""
+    out: dict[str, dict[int, int]] = {}
+    for dim, chain in chains.items():
+        for idx, qid in enumerate(chain):
+            for i in range(1, 5):
+                s = str(qn.rows[qid].get(f"score_{i}", "")).strip()
+                if s.isdigit():
+                    out.setdefault(dim, {})[int(s)] = idx
+    return out
+
+
+class Router:
+    """
+    Picks entry questions from priors. Context for a dimension is the rounded mean
+    band of the dimensions answered so far. With enough history the band
+    distribution per (dimension, context) is learned from stored profiles;
+    otherwise a structural prior ("bands tend to agree across dimensions") is used.
+    """
+
+    def __init__(self, qn: Questionnaire, profiles: list[dict] | None = None):
+        self.qn = qn
+        self.chains = dimension_chains(qn)
+        self.bands = level_bands(qn, self.chains)
+        self._pos = {qid: (dim, i) for dim, ch in self.chains.items() for i, qid in enumerate(ch)}
+        self._counts: dict[tuple, list[float]] = {}
+        self._order = list(self.chains)
+        if profiles:
+            self.fit(profiles)
+
+    def _band(self, dim: str, level) -> int | None:
+        try:
+            return self.bands.get(dim, {}).get(int(level))
+        except (TypeError, ValueError):
+            return None
+
+    def _context_for(self, dim: str, levels: dict, upto: str | None = None) -> int | None:
+        """_context clamped to `dim`'s chain, so chains of different lengths share one key space."""
+        ctx = self._context(levels, upto)
+        return None if ctx is None else min(ctx, len(self.chains[dim]) - 1)
+
+    def _context(self, levels: dict, upto: str | None = None) -> int | None:
+        bands = []
+        for dim in self._order:
+            if dim == upto:
+                break
+            if upto is None and dim not in levels:
+                continue
+            b = self._band(dim, levels.get(dim))
+            if b is not None:
+                bands.append(b)
+        return round(sum(bands) / len(bands)) if bands else None
+
+    def fit(self, profiles: list[dict]) -> "Router":
+        """profiles: [{"CRL": 3, ...}, ...] (levels per dimension)."""
+        self._counts = {}
+        self._add(profiles)
+        return self
+
+    def updated(self, profiles: list[dict]) -> "Router":
+        """A copy with `profiles` added to the learned counts; this router is left as is."""
+        new = Router(self.qn)
+        new._counts = {key: list(c) for key, c in self._counts.items()}
+        new._add(profiles)
+        return new
+
+    def _add(self, profiles: list[dict]) -> None:
+        counts = self._counts
+        for levels in profiles:
+            for dim in self._order:
+                b = self._band(dim, levels.get(dim))
+                if b is None:
+                    continue
+                n = len(self.chains[dim])
+                # context = dimensions that come before this one in the walk
+                ctx = self._context_for(dim, levels, upto=dim)
+                for key in ((dim, ctx), (dim, "any")):
+                    counts.setdefault(key, [0.0] * n)[b] += 1
+
+    def distribution(self, dim: str, levels: dict) -> list[float]:
+        n = len(self.chains[dim])
+        ctx = self._context_for(dim, levels)
+        if ctx is None:
+            prior = [1.0 / n] * n
+        else:
+            prior = [0.6 if i == ctx else 0.4 / (n - 1) for i in range(n)] if n > 1 else [1.0]
+        for key in ((dim, ctx), (dim, "any")):
+            c = self._counts.get(key)
+            if c and sum(c) >= MIN_SUPPORT:
+                tot = sum(c) + PRIOR_WEIGHT
+                return [(c[i] + PRIOR_WEIGHT * prior[i]) / tot for i in range(n)]
+        return prior
+
+    def entry(self, dim: str, levels: dict) -> str:
+        """Question id to open `dim` with, given the levels answered so far."""
+        chain = self.chains[dim]
+        p = self.distribution(dim, levels)
+        # weighted median minimises E|b - e|; ties go to the higher band (the old behaviour)
+        acc = 0.0
+        for idx, w in enumerate(p):
+            acc += w
+            if acc >= 0.5 - 1e-9:
+                return chain[idx]
+        return chain[-1]
+
+    def route(self, next_qid: str | None, levels: dict) -> str | None:
+        """Swap a jump to the top of a new dimension for the adaptive entry question."""
+        pos = self._pos.get(next_qid or "")
+        if pos is None or pos[1] != 0 or pos[0] in levels:
+            return next_qid
+        return self.entry(pos[0], levels)
+
+    def escalation(self, qid: str, visited: set[str]) -> str | None:
+        """Question one band up, if we entered below it and haven't been there yet."""
+        pos = self._pos.get(qid)
+        if pos is None or pos[1] == 0:
+            return None
+        up = self.chains[pos[0]][pos[1] - 1]
+        return None if up in visited else up
+
+
+# ---------------- offline simulator ----------------
+def simulate(qn: Questionnaire, truth: dict[str, int], router: Router | None) -> tuple[int, dict]:
+    """
+    Walk the real question graph for a respondent whose true levels are `truth`
+    (top-down when router is None). Returns (questions asked, final levels).
+    """
+    history, final, visited = {}, {}, set()
+    qid = router.route(qn.start, final) if router else qn.start
+    asked = 0
+    while qid and asked < 200:
+        row = qn.rows[qid]
+        dim = row["dimension"].strip()
+        asked += 1
+        visited.add(qid)
+        opts = [(str(row.get(f"score_{i}", "")).strip(), str(row.get(f"next_{i}", "")).strip())
+                for i in range(1, 5) if row.get(f"option_{i}", "")]
+        want = str(truth[dim])
+        esc = router.escalation(qid, visited) if router else None
+        scored = [int(s) for s, _ in opts if s.isdigit()]
+        if want in [s for s, _ in opts]:
+            score, nxt = next(o for o in opts if o[0] == want)
+            record_score(history, final, dim, int(score))
+        elif esc and scored and int(want) > max(scored):
+            qid = esc
+            continue
+        else:
+            score, nxt = next(((s, n) for s, n in opts if not s), ("", ""))
+        if row.get("terminal", "").strip().upper() == "TRUE" or not nxt:
+            break
+        qid = router.route(nxt, final) if router else nxt
+    return asked, final
+
+
+def synthetic_profiles(n: int, dims: list[str], seed: int = 7) -> list[dict]:
+    """Correlated profiles: one underlying maturity plus per-dimension noise."""
+    rnd = random.Random(seed)
+    out = []
+    for _ in range(n):
+        base = rnd.triangular(1, 9, 3)
+        out.append({d: max(1, min(9, round(rnd.gauss(base, 1.5)))) for d in dims})
+    return out
+
+
+def compare(qn: Questionnaire, profiles: list[dict]) -> dict:
+    """Fit on the first half, replay the second half both ways."""
+    dims = list(dimension_chains(qn))
+    profiles = [p for p in profiles if all(d in p for d in dims)]
+    half = len(profiles) // 2
+    router = Router(qn, profiles[:half])
+    test = profiles[half:] or profiles
+    base = adapt = mismatches = 0
+    for p in test:
+        n0, f0 = simulate(qn, p, None)
+        n1, f1 = simulate(qn, p, router)
+        base += n0
+        adapt += n1
+        mismatches += f0 != f1
+    return {
+        "sessions": len(test),
+        "avg_questions_top_down": base / max(1, len(test)),
+        "avg_questions_adaptive": adapt / max(1, len(test)),
+        "final_level_mismatches": mismatches,
+    }
+
+
+if __name__ == "__main__":
+    from utils.history import HistoryStore
+    from utils.questionnaire import get_questionnaire
+
+    qn = get_questionnaire()
+    dims = list(dimension_chains(qn))
+    if "--synthetic" in sys.argv:
+        n = int(sys.argv[sys.argv.index("--synthetic") + 1])
+        profiles, source = synthetic_profiles(n, dims), f"{n} synthetic profiles"
+    else:
+        profiles = [r["levels"] for r in HistoryStore().all_records() if r["variant"] == qn.key]
+        source = f"{len(profiles)} stored assessments"
+        if len(profiles) < 2 * MIN_SUPPORT:
+            profiles, source = synthetic_profiles(5000, dims), "5000 synthetic profiles (history too small)"
+    res = compare(qn, profiles)
+    print(f"source: {source}")
+    for k, v in res.items():
+        print(f"{k:>26}: {v:.2f}" if isinstance(v, float) else f"{k:>26}: {v}")
+    # one confirm = one rerun, so the question saving is also the rerun saving
+    saved = 1 - res["avg_questions_adaptive"] / max(1e-9, res["avg_questions_top_down"])
+    print(f"{'questions/reruns saved':>26}: {saved:.1%}")
@@ -1,10 +1,42 @@
 import pandas as pd
 from typing import Dict, List
 
+# display order used by the radar, the results page and the history store
+DIMENSIONS = ["CRL", "SRL", "BRL", "TMRL", "FRL", "IPRL", "TRL"]
+
 def load_questions(path="data/questions.csv") -> pd.DataFrame:
     # read IDs as strings so "200" or "BRL-01" both work
     return pd.read_csv(path, dtype=str).fillna("")
 
+def load_rl_descriptions(path="data/rl_descriptions.csv",
+                         strict: bool = False) -> Dict[str, Dict[int, Dict[str, str]]]:
+    """Load per-dimension, per-level texts from CSV.
+    CSV columns: dimension,level,title,body
+    With strict=True a missing or unreadable file raises instead of returning {}.
+    """
+    try:
+        df = pd.read_csv(path, dtype={"dimension": str, "level": int, "title": str, "body": str})
+    except Exception:
+        if strict:
+            raise
+        # If file not found or broken, return empty dict (UI will show a fallback message)
+        return {}
+
+    out = {}
+    for _, r in df.iterrows():
+        dim = (r.get("dimension", "") or "").strip().upper()
+        if not dim:
+            continue
+        try:
+            lvl = int(r.get("level", 0))
+        except Exception:
+            continue
+        out.setdefault(dim, {})[lvl] = {
+            "title": (r.get("title", "") or "").strip(),
+            "body": (r.get("body", "") or "").strip(),
+        }
+    return out
+
 def compute_final_levels(history_by_dim: Dict[str, List[int]]) -> Dict[str, int]:
     """
     Final level for a dimension = the last valid (>0) score recorded while branching.
@@ -15,3 +47,28 @@ def compute_final_levels(history_by_dim: Dict[str, List[int]]) -> Dict[str, int]
         if vals:
             final[dim] = int(vals[-1])
     return final
+
+def record_score(history_by_dim: Dict[str, List[int]], final_levels: Dict[str, int],
+                 dim: str, score: int) -> None:
+    """
+    Record one confirmed (>0) score and keep final_levels in step, so
+    final_levels == compute_final_levels(history_by_dim) without rescanning.
+    """
+    history_by_dim.setdefault(dim, []).append(int(score))
+    final_levels[dim] = int(score)
+
+def undo_score(history_by_dim: Dict[str, List[int]], final_levels: Dict[str, int],
+               dim: str, score: int) -> None:
+    """Undo record_score: drop the last score if it matches and fall back to the previous one."""
+    vals = history_by_dim.get(dim)
+    if not vals or vals[-1] != score:
+        return
+    vals.pop()
+    if vals:
+        final_levels[dim] = vals[-1]
+    else:
+        final_levels.pop(dim, None)
+
+def level_deltas(before: Dict[str, int], after: Dict[str, int]) -> Dict[str, int]:
+    """Per-dimension change between two assessments (dimensions present in both)."""
+    return {dim: int(after[dim]) - int(before[dim]) for dim in after if dim in before}
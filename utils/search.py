@@ -0,0 +1,150 @@
+import heapq
+import math
+import re
+import weakref
+from collections import Counter
+
+from utils.questionnaire import Questionnaire
+
+# BM25 parameters (the usual defaults)
+K1 = 1.2
+B = 0.75
+
+_WORD = re.compile(r"[^\W_]+", re.UNICODE)
+
+_STOP = {
+    "en": set("""a an and are as at be been but by can could do does for from has have if in
+        into is it its of on or our so than that the their there these they this to was we were
+        what when which who will with you your yet not no""".split()),
+    "sv": set("""och att det som en ett i på är av för med till den de har inte om men var
+        vi ni du jag kan ska så eller från har hade vara sina sitt sin era er vår""".split()),
+}
+
+# Light suffix stripping: longest matching suffix first, keep at least 3 letters.
+_SUFFIXES = {
+    "en": ["ational", "ization", "fulness", "ousness", "iveness", "ments", "ment", "ings", "ing",
+           "edly", "ies", "ied", "ers", "er", "ed", "ly", "s"],
+    "sv": ["heterna", "heten", "arnas", "ernas", "ornas", "arna", "erna", "orna", "ande", "ende",
+           "het", "ast", "are", "ens", "ets", "ar", "er", "or", "en", "et", "na", "a", "e", "s"],
+}
+
+# English plural "-es" only after s/x/z/ch/sh; elsewhere the "e" belongs to the word
+_ES_AFTER = ("sses", "xes", "zes", "ches", "shes")
+
+
+def lang_of(variant_key: str) -> str:
+    """Variant naming convention: "sv", "medtech-sv", ... are Swedish; everything else English."""
+    parts = re.split(r"[-_.]", variant_key.lower())
+    return "sv" if "sv" in parts else "en"
+
+
+def stem(word: str, lang: str = "en") -> str:
+    for suf in _SUFFIXES.get(lang, ()):
+        if word.endswith(suf) and len(word) - len(suf) >= 3:
+            if lang == "en" and suf == "s":
+                if word.endswith("ss"):
+                    break           # process, business: not a plural
+                if word.endswith(_ES_AFTER):
+                    suf = "es"      # boxes -> box, matches -> match; sales -> sale
+            word = word[:-len(suf)]
+            if lang == "en" and suf in ("ies", "ied"):
+                word += "y"
+            break
+    return word
+
+
+def tokenize(text: str, lang: str = "en") -> list[str]:
+    stop = _STOP.get(lang, set())
+    return [stem(w, lang) for w in _WORD.findall(text.lower()) if w not in stop]
+
+
+class SearchIndex:
+    """
+    In-memory inverted index with BM25 ranking over a questionnaire's option texts
+    ("option" docs, one per answer tile) and RL description titles + bodies
+    ("level" docs, one per dimension/level).
+    """
+
+    def __init__(self, qn: Questionnaire, lang: str = "en"):
+        self.lang = lang
+        self.docs: list[dict] = []
+        texts: list[str] = []
+
+        for qid in qn.order:
+            row = qn.rows[qid]
+            for i in range(1, 5):
+                opt = row.get(f"option_{i}", "")
+                if not opt:
+                    continue
+                score = str(row.get(f"score_{i}", "")).strip()
+                self.docs.append({
+                    "id": f"{qid}:{i}", "kind": "option", "qid": qid,
+                    "dim": row["dimension"].strip(),
+                    "level": int(score) if score.isdigit() else None,
+                    "text": opt,
+                })
+                texts.append(opt)
+        for dim, lvls in qn.rl_text.items():
+            for lvl, info in sorted(lvls.items(), reverse=True):
+                self.docs.append({
+                    "id": f"{dim}:{lvl}", "kind": "level", "qid": None,
+                    "dim": dim, "level": lvl,
+                    "text": info.get("title", "") or f"{dim} {lvl}", "body": info.get("body", ""),
+                })
+                texts.append(f"{info.get('title', '')} {info.get('body', '')}")
+
+        # term -> [(doc, tf), ...]; per-doc length normalisation precomputed
+        self._postings: dict[str, list[tuple[int, int]]] = {}
+        lengths = []
+        for d, text in enumerate(texts):
+            tf = Counter(tokenize(text, lang))
+            lengths.append(sum(tf.values()))
+            for term, n in tf.items():
+                self._postings.setdefault(term, []).append((d, n))
+        avg = sum(lengths) / len(lengths) if lengths else 1.0
+        self._norm = [K1 * (1 - B + B * n / avg) for n in lengths]
+        n_docs = len(texts)
+        self._idf = {
+            t: math.log(1 + (n_docs - len(p) + 0.5) / (len(p) + 0.5)) for t, p in self._postings.items()
+        }
+
+    def search(self, query: str, k: int = 10, kind: str | None = None,
+               exclude: set[str] | None = None) -> list[dict]:
+        """Top-k docs for `query`, best first; each hit is the doc dict plus "score"."""
+        scores: dict[int, float] = {}
+        for term in set(tokenize(query, self.lang)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for d, tf in self._postings[term]:
+                scores[d] = scores.get(d, 0.0) + idf * tf * (K1 + 1) / (tf + self._norm[d])
+        hits = (
+            (s, d) for d, s in scores.items()
+            if (kind is None or self.docs[d]["kind"] == kind)
+            and not (exclude and self.docs[d]["id"] in exclude)
+        )
+        return [dict(self.docs[d], score=round(s, 4)) for s, d in heapq.nlargest(k, hits)]
+
+    def related(self, dim: str, level: int, k: int = 3) -> list[dict]:
+        """Answer statements closest in wording to one level description."""
+        doc = next((x for x in self.docs if x["kind"] == "level"
+                    and x["dim"] == dim and x["level"] == level), None)
+        if doc is None:
+            return []
+        return self.search(f"{doc['text']} {doc.get('body', '')}", k=k, kind="option")
+
+
+# One index per questionnaire snapshot; dropped together with the snapshot after a reload.
+_indexes: "weakref.WeakKeyDictionary[Questionnaire, SearchIndex]" = weakref.WeakKeyDictionary()
+
+
+def index_for(qn: Questionnaire) -> SearchIndex:
+    idx = _indexes.get(qn)
+    if idx is None:
+        idx = _indexes[qn] = SearchIndex(qn, lang_of(qn.key))
+    return idx
+
+
+def search(qn: Questionnaire, query: str, k: int = 10, kind: str | None = None) -> list[dict]:
+    """Function API: search option texts ("option") and/or level descriptions ("level")."""
+    return index_for(qn).search(query, k=k, kind=kind)
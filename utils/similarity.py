@@ -0,0 +1,183 @@
+import numpy as np
+import pandas as pd
+
+from utils.scoring import DIMENSIONS
+
+# Above this many profiles, search distinct profile vectors instead of rows.
+# Levels are 0..9 on 7 dimensions, so real data collapses into far fewer distinct
+# vectors than rows and each distinct vector is a bucket of identical profiles.
+BUCKET_THRESHOLD = 200_000
+
+
+def _vector(levels: dict) -> list:
+    return [levels.get(d) for d in DIMENSIONS]
+
+
+def _encode(values, lookup: dict | None = None) -> tuple[np.ndarray, dict]:
+    """
+    Strings -> int codes, extending a copy of `lookup` (name -> code) with unseen
+    names; hashing via pd.factorize is much cheaper than np.unique's object sort.
+    """
+    lookup = dict(lookup or {})
+    codes, uniq = pd.factorize(pd.Series(list(values), dtype=object))
+    remap = np.array([lookup.setdefault(v, len(lookup)) for v in uniq], dtype=np.int32)
+    return (remap[codes] if len(uniq) else np.zeros(len(codes), dtype=np.int32)), lookup
+
+
+def _to_datetime(ts: str) -> np.datetime64:
+    return np.datetime64(ts[:19])  # drop the UTC offset; the store only writes UTC
+
+
+class ProfileIndex:
+    """
+    k-NN over readiness profiles (7-dim level vectors, unreached dimension = 0),
+    with optional cohort / date filters. Distance is squared Euclidean on levels.
+    """
+
+    def __init__(self, records: list[dict]):
+        self._load([(r["id"], r["startup"], r.get("cohort", ""), r.get("variant", ""), r["taken_at"],
+                     *_vector(r["levels"])) for r in records])
+
+    @classmethod
+    def from_rows(cls, rows: list[tuple]) -> "ProfileIndex":
+        """
+        Build from HistoryStore.profile_rows() tuples (id, startup, cohort, variant,
+        taken_at, *levels) without a dict per row.
+        """
+        self = cls.__new__(cls)
+        self._load(rows)
+        return self
+
+    def extend(self, rows: list[tuple]) -> "ProfileIndex":
+        """A new index with `rows` (newer than max_id) appended; this one stays as it is."""
+        if not rows:
+            return self
+        new = ProfileIndex.__new__(ProfileIndex)
+        new._load(rows, base=self)
+        return new
+
+    @property
+    def max_id(self) -> int:
+        return int(self.ids.max()) if len(self.ids) else 0
+
+    def _load(self, rows: list[tuple], base: "ProfileIndex | None" = None):
+        cols = list(zip(*rows)) or [()] * (5 + len(DIMENSIONS))
+        levels = np.array(cols[5:], dtype=np.float64).T.reshape(len(rows), len(DIMENSIONS))
+        ids = np.array(cols[0], dtype=np.int64)
+        # strings are kept as integer codes so filters are plain int compares
+        startup_codes, self._startup_lookup = _encode(cols[1], base and base._startup_lookup)
+        cohort_codes, self._cohort_lookup = _encode(cols[2], base and base._cohort_lookup)
+        taken_at = np.array([t[:19] for t in cols[4]], dtype="datetime64[s]")
+        matrix = np.nan_to_num(levels, nan=0).astype(np.int16)
+        if base is not None:
+            ids = np.concatenate([base.ids, ids])
+            startup_codes = np.concatenate([base._startup_codes, startup_codes])
+            cohort_codes = np.concatenate([base._cohort_codes, cohort_codes])
+            taken_at = np.concatenate([base.taken_at, taken_at])
+            matrix = np.concatenate([base.matrix, matrix])
+
+        n = len(ids)
+        self.ids = ids
+        self._startup_codes, self._cohort_codes = startup_codes, cohort_codes
+        self._startup_names = np.array(list(self._startup_lookup), dtype=object)
+        self._cohort_names = np.array(list(self._cohort_lookup), dtype=object)
+        self.taken_at = taken_at
+        self.matrix = matrix
+
+        # |x - q|^2 = |x|^2 - 2 x.q + |q|^2; levels are small ints, so float32 stays exact
+        self._f = self.matrix.astype(np.float32)
+        self._norms = (self._f ** 2).sum(axis=1)
+
+        self._bucketed = False
+        if n > BUCKET_THRESHOLD:
+            self._uniq, inverse = np.unique(self.matrix, axis=0, return_inverse=True)
+            # only worth it when profiles actually collapse
+            self._bucketed = len(self._uniq) * 4 <= n
+        if self._bucketed:
+            inverse = inverse.reshape(-1)
+            # CSR layout: rows of bucket b are _members[_starts[b]:_starts[b + 1]]
+            self._members = np.argsort(inverse, kind="stable")
+            self._starts = np.searchsorted(inverse[self._members], np.arange(len(self._uniq) + 1))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+    def _mask(self, rows, cohort, since, until, exclude_startup):
+        """Boolean filter over `rows`, or None when no filter is set."""
+        if not (cohort or since or until or exclude_startup):
+            return None
+        m = np.True_
+        if cohort:
+            m = m & (self._cohort_codes[rows] == self._cohort_lookup.get(cohort, -1))
+        if since:
+            m = m & (self.taken_at[rows] >= _to_datetime(since))
+        if until:
+            m = m & (self.taken_at[rows] < _to_datetime(until))
+        if exclude_startup:
+            m = m & (self._startup_codes[rows] != self._startup_lookup.get(exclude_startup, -1))
+        return m
+
+    def query(self, levels: dict, k: int = 5, cohort: str | None = None,
+              since: str | None = None, until: str | None = None,
+              exclude_startup: str | None = None) -> list[dict]:
+        """Top-k nearest stored profiles, closest first."""
+        if not len(self) or k <= 0:
+            return []
+        q = np.array([int(v or 0) for v in _vector(levels)], dtype=np.int16)
+        rows = self._query_bucketed(q, k, cohort, since, until, exclude_startup) if self._bucketed \
+            else self._query_exact(q, k, cohort, since, until, exclude_startup)
+        dist = ((self.matrix[rows] - q) ** 2).sum(axis=1)
+        return [
+            {
+                "id": int(self.ids[i]),
+                "startup": self._startup_names[self._startup_codes[i]],
+                "cohort": self._cohort_names[self._cohort_codes[i]],
+                "taken_at": str(self.taken_at[i]),
+                "distance": float(np.sqrt(d)),
+                "levels": {dim: int(v) for dim, v in zip(DIMENSIONS, self.matrix[i]) if v},
+            }
+            for i, d in zip(rows, dist)
+        ]
+
+    def _query_exact(self, q, k, *filters) -> np.ndarray:
+        dist = self._norms - 2 * (self._f @ q.astype(np.float32))
+        m = self._mask(slice(None), *filters)
+        if m is not None:
+            dist[~m] = np.inf
+            k = min(k, int(m.sum()))
+        if k < len(dist):
+            rows = np.argpartition(dist, k)[:k]
+        else:
+            rows = np.arange(len(dist))[:k]
+        return rows[np.argsort(dist[rows], kind="stable")]
+
+    def _query_bucketed(self, q, k, *filters) -> np.ndarray:
+        m = self._mask(slice(None), *filters)
+        if m is not None:
+            rows = np.flatnonzero(m)
+            if len(rows) <= len(self._uniq):
+                # selective filter: scanning the matching rows beats walking buckets
+                dist = self._norms[rows] - 2 * (self._f[rows] @ q.astype(np.float32))
+                top = np.argsort(dist, kind="stable")[:k]
+                return rows[top]
+            k = min(k, len(rows))
+
+        # walk distinct profiles nearest-first, keeping matching member rows until k are found;
+        # only the nearest `want` buckets are ordered, doubling if filters reject too many
+        dist = ((self._uniq - q) ** 2).sum(axis=1, dtype=np.int32)
+        want, done = 4 * k, 0
+        found: list[int] = []
+        while done < len(dist):
+            want = min(want, len(dist))
+            near = np.argpartition(dist, want - 1)[:want] if want < len(dist) else np.arange(len(dist))
+            near = near[np.argsort(dist[near], kind="stable")][done:]
+            for b in near:
+                members = self._members[self._starts[b]:self._starts[b + 1]]
+                if m is not None:
+                    members = members[m[members]]
+                found.extend(members[:k - len(found)])
+                if len(found) >= k:
+                    return np.array(found, dtype=np.int64)
+            done, want = want, want * 2
+        return np.array(found, dtype=np.int64)